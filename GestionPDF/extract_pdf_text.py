@@ -4,12 +4,49 @@ Interface graphique pour l'extraction de texte de fichiers PDF
 Utilise tkinter pour l'interface et pypdf/pdfplumber pour l'extraction
 """
 
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+import time
+
+# Début du chargement du script, pour mesurer le temps de démarrage
+START_TIME = time.perf_counter()
+
+import contextlib
+import hashlib
+import io
+import os
+import signal
+import sqlite3
+import tempfile
 from pathlib import Path
+import argparse
 import threading
 import sys
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox, scrolledtext
+except ImportError:  # Serveurs sans interface graphique : seule la ligne de commande est disponible
+    tk = None
+
+# pypdf et pdfplumber ne sont importés qu'au premier besoin (voir import_engine),
+# et préchargés en arrière-plan par l'interface graphique
+
+# Durées de démarrage (secondes depuis START_TIME, ou durée d'un import)
+startup_timings = {}
+
+def record_timing(name, since=None):
+    """Note la durée écoulée depuis since (par défaut, depuis le début du chargement)"""
+    startup_timings[name] = time.perf_counter() - (START_TIME if since is None else since)
+
+def format_timings():
+    """Décrit les durées de démarrage notées"""
+    return " | ".join(f"{name} : {seconds * 1000:.0f} ms"
+                      for name, seconds in startup_timings.items())
+
 
 class PDFExtractorGUI:
     def __init__(self, root):
@@ -22,14 +59,57 @@ class PDFExtractorGUI:
         self.pdf_path = tk.StringVar()
         self.output_path = tk.StringVar()
         self.method = tk.StringVar(value="auto")
+        self.jobs = tk.StringVar(value="1")
+        self.page_selection = tk.StringVar()
         self.progress_var = tk.DoubleVar()
         self.status_text = tk.StringVar(value="Prêt")
+        self.page_entry = tk.StringVar()
+        self.page_count_text = tk.StringVar(value="/ 0")
+        self.memory_text = tk.StringVar(value=memory_summary())
         
-        self.extracted_text = ""
+        # Texte extrait, relu page par page par la visionneuse
+        self.spool = None
+        self.view_start = 1
+        self.view_stop = 1
+        self.spool_source = None  # (PDF, sélection de pages) du texte affiché
         self.is_extracting = False
+        self.cancel = None  # Signal d'annulation de l'extraction en cours
+        self.cache = None
+        self.index = None
+        
+        # Fenêtre de recherche dans l'index (voir open_search)
+        self.search_window = None
+        self.search_query = tk.StringVar()
+        self.search_hits = []
         
         self.create_widgets()
         self.center_window()
+        self.root.after(0, self.window_shown)
+    
+    def window_shown(self):
+        """Note une seule fois la durée d'affichage de la fenêtre, puis précharge"""
+        record_timing("fenêtre")
+        self.warm_up()
+    
+    def warm_up(self, *args):
+        """
+        Charge dans un thread la bibliothèque de la méthode choisie, dès que
+        la fenêtre est affichée puis à chaque changement de méthode, pour que
+        l'extraction ne l'attende pas. Les durées de démarrage sont affichées
+        dans le statut tant qu'aucun fichier n'est choisi.
+        """
+        method = self.method.get()
+        
+        def load():
+            warm_engine(method)
+            self.root.after(0, self.show_timings)
+        
+        threading.Thread(target=load, daemon=True).start()
+    
+    def show_timings(self):
+        """Affiche les durées de démarrage si aucune autre information n'est affichée"""
+        if self.status_text.get().startswith("Prêt"):
+            self.status_text.set(f"Prêt (démarrage : {format_timings()})")
     
     def center_window(self):
         """Centre la fenêtre sur l'écran"""
@@ -74,11 +154,23 @@ class PDFExtractorGUI:
         method_frame.grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=(0, 15))
         
         ttk.Radiobutton(method_frame, text="Automatique (recommandé)", 
-                       variable=self.method, value="auto").pack(side=tk.LEFT, padx=(0, 15))
+                       variable=self.method, value="auto",
+                       command=self.warm_up).pack(side=tk.LEFT, padx=(0, 15))
         ttk.Radiobutton(method_frame, text="PyPDF (rapide)", 
-                       variable=self.method, value="pypdf").pack(side=tk.LEFT, padx=(0, 15))
+                       variable=self.method, value="pypdf",
+                       command=self.warm_up).pack(side=tk.LEFT, padx=(0, 15))
         ttk.Radiobutton(method_frame, text="PDFPlumber (précis)", 
-                       variable=self.method, value="pdfplumber").pack(side=tk.LEFT)
+                       variable=self.method, value="pdfplumber",
+                       command=self.warm_up).pack(side=tk.LEFT, padx=(0, 15))
+        
+        # Nombre de processus se partageant les pages
+        ttk.Label(method_frame, text="Processus:").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Spinbox(method_frame, from_=1, to=os.cpu_count() or 1,
+                    textvariable=self.jobs, width=4).pack(side=tk.LEFT)
+        
+        # Pages à extraire (vide : tout le document), par exemple 1-20,300-310
+        ttk.Label(method_frame, text="Pages:").pack(side=tk.LEFT, padx=(15, 5))
+        ttk.Entry(method_frame, textvariable=self.page_selection, width=14).pack(side=tk.LEFT)
         
         # === Section 3: Fichier de sortie ===
         ttk.Label(main_frame, text="Fichier de sortie:", font=('Arial', 10, 'bold')).grid(
@@ -101,6 +193,10 @@ class PDFExtractorGUI:
                                         command=self.start_extraction, width=20)
         self.extract_button.pack(side=tk.LEFT, padx=5)
         
+        self.cancel_button = ttk.Button(button_frame, text="⏹ Annuler", 
+                                       command=self.cancel_extraction, width=20, state='disabled')
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        
         self.save_button = ttk.Button(button_frame, text="💾 Sauvegarder", 
                                      command=self.save_text, width=20, state='disabled')
         self.save_button.pack(side=tk.LEFT, padx=5)
@@ -109,6 +205,9 @@ class PDFExtractorGUI:
                                       command=self.clear_all, width=20)
         self.clear_button.pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(button_frame, text="🔍 Rechercher", command=self.open_search,
+                   width=20).pack(side=tk.LEFT, padx=5)
+        
         # === Section 5: Barre de progression ===
         progress_frame = ttk.Frame(main_frame)
         progress_frame.grid(row=7, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
@@ -129,6 +228,21 @@ class PDFExtractorGUI:
         ttk.Label(main_frame, text="Texte extrait:", font=('Arial', 10, 'bold')).grid(
             row=9, column=0, sticky=tk.W, pady=(0, 5))
         
+        # Navigation : seules PAGES_PER_VIEW pages sont chargées dans la zone de texte
+        nav_frame = ttk.Frame(main_frame)
+        nav_frame.grid(row=9, column=1, columnspan=2, sticky=tk.E, pady=(0, 5))
+        ttk.Button(nav_frame, text="◀", width=3,
+                   command=lambda: self.show_pages(self.view_start - PAGES_PER_VIEW)).pack(
+            side=tk.LEFT)
+        ttk.Label(nav_frame, text="Page:").pack(side=tk.LEFT, padx=(10, 5))
+        page_entry = ttk.Entry(nav_frame, textvariable=self.page_entry, width=7)
+        page_entry.pack(side=tk.LEFT)
+        page_entry.bind('<Return>', lambda event: self.jump_to_page())
+        ttk.Label(nav_frame, textvariable=self.page_count_text).pack(side=tk.LEFT, padx=5)
+        ttk.Button(nav_frame, text="Aller", width=6, command=self.jump_to_page).pack(side=tk.LEFT)
+        ttk.Button(nav_frame, text="▶", width=3,
+                   command=lambda: self.show_pages(self.view_stop)).pack(side=tk.LEFT, padx=(10, 0))
+        
         text_frame = ttk.Frame(main_frame)
         text_frame.grid(row=10, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         text_frame.columnconfigure(0, weight=1)
@@ -144,6 +258,8 @@ class PDFExtractorGUI:
         
         self.info_label = ttk.Label(info_frame, text="Aucun fichier chargé", font=('Arial', 8))
         self.info_label.pack(side=tk.LEFT, padx=5)
+        ttk.Label(info_frame, textvariable=self.memory_text, font=('Arial', 8)).pack(
+            side=tk.RIGHT, padx=5)
     
     def browse_pdf(self):
         """Ouvre un dialogue pour sélectionner un fichier PDF"""
@@ -183,113 +299,133 @@ class PDFExtractorGUI:
             messagebox.showinfo("Info", "Une extraction est déjà en cours")
             return
         
+        try:
+            if int(self.jobs.get()) < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Erreur", "Le nombre de processus doit être un entier positif")
+            return
+        
+        try:
+            page_ranges = parse_page_ranges(self.page_selection.get())
+        except ValueError as e:
+            messagebox.showerror("Erreur", str(e))
+            return
+        
         # Désactiver les boutons pendant l'extraction
         self.extract_button.config(state='disabled')
         self.save_button.config(state='disabled')
-        self.text_area.delete(1.0, tk.END)
+        self.cancel_button.config(state='normal')
+        self.cancel = threading.Event()
         self.progress_var.set(0)
+        if self.spool is not None:
+            self.spool.close()
+        self.spool = PageSpool()
+        self.spool_source = (os.path.abspath(self.pdf_path.get()), page_ranges)
+        self.show_pages(1)
         
-        # Lancer l'extraction dans un thread
-        thread = threading.Thread(target=self.extract_text, daemon=True)
+        # Lancer l'extraction dans un thread (les variables Tk sont lues ici,
+        # dans le thread de l'interface)
+        thread = threading.Thread(target=self.extract_text,
+                                  args=(self.pdf_path.get(), self.method.get(),
+                                        int(self.jobs.get()), self.spool, page_ranges,
+                                        self.cancel),
+                                  daemon=True)
         thread.start()
     
-    def extract_text(self):
-        """Extrait le texte du PDF"""
+    def cancel_extraction(self):
+        """Demande l'arrêt de l'extraction après la page en cours"""
+        if self.cancel is not None:
+            self.cancel.set()
+            self.cancel_button.config(state='disabled')
+            self.status_text.set("Annulation en cours...")
+    
+    def extract_text(self, pdf_path, method, jobs, spool, page_ranges, cancel):
+        """
+        Extrait le texte du PDF avec le moteur d'extraction, page par page dans
+        spool, jusqu'à ce que cancel soit activé
+        """
         self.is_extracting = True
-        method = self.method.get()
         
         try:
-            self.status_text.set("Extraction en cours...")
-            self.progress_var.set(10)
-            
-            if method == "auto":
-                # Essayer pdfplumber d'abord
-                text = self.extract_with_pdfplumber()
-                if text is None:
-                    self.root.after(0, lambda: self.status_text.set("Essai avec pypdf..."))
-                    text = self.extract_with_pypdf()
-            elif method == "pdfplumber":
-                text = self.extract_with_pdfplumber()
-            else:  # pypdf
-                text = self.extract_with_pypdf()
+            self.root.after(0, lambda: self.status_text.set("Extraction en cours..."))
+            self.root.after(0, lambda: self.progress_var.set(10))
             
-            if text is None:
+            try:
+                if self.cache is None:
+                    self.cache = ExtractionCache()
+                if self.index is None:
+                    self.index = SearchIndex()
+                characters, used_method = write_pages(pdf_path, spool, method, jobs,
+                                                      self.report_progress, self.cache,
+                                                      page_ranges, cancel, self.index)
+            except ImportError:
                 self.root.after(0, self.show_library_error)
                 return
             
-            self.extracted_text = text
-            
-            # Afficher le texte dans la zone de texte
-            self.root.after(0, lambda: self.text_area.insert(1.0, text))
-            self.root.after(0, lambda: self.progress_var.set(100))
-            self.root.after(0, lambda: self.status_text.set(
-                f"Extraction terminée! {len(text)} caractères extraits"))
+            self.root.after(0, self.refresh_view)
+            if cancel.is_set():
+                self.root.after(0, lambda: self.status_text.set(
+                    f"Extraction annulée : {len(spool)} pages conservées ({characters} caractères)"))
+            else:
+                self.root.after(0, lambda: self.progress_var.set(100))
+                self.root.after(0, lambda: self.status_text.set(
+                    f"Extraction terminée! {characters} caractères extraits avec {used_method}"))
             self.root.after(0, lambda: self.info_label.config(
-                text=f"📄 {Path(self.pdf_path.get()).name} | {len(text):,} caractères"))
+                text=f"📄 {Path(pdf_path).name} | {len(spool)} pages | {characters:,} caractères"))
             self.root.after(0, lambda: self.save_button.config(state='normal'))
+            memory = memory_summary(children=True)
+            self.root.after(0, lambda: self.memory_text.set(memory))
             
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Erreur", f"Erreur lors de l'extraction:\n{str(e)}"))
+            error = str(e)
+            self.root.after(0, lambda: messagebox.showerror("Erreur", f"Erreur lors de l'extraction:\n{error}"))
             self.root.after(0, lambda: self.status_text.set("Erreur lors de l'extraction"))
         finally:
             self.is_extracting = False
             self.root.after(0, lambda: self.extract_button.config(state='normal'))
+            self.root.after(0, lambda: self.cancel_button.config(state='disabled'))
     
-    def extract_with_pypdf(self):
-        """Extrait avec pypdf"""
-        try:
-            from pypdf import PdfReader
-        except ImportError:
-            return None
-        
-        try:
-            reader = PdfReader(self.pdf_path.get())
-            text = ""
-            total_pages = len(reader.pages)
-            
-            for i, page in enumerate(reader.pages, 1):
-                progress = 10 + (80 * i / total_pages)
-                self.root.after(0, lambda p=progress: self.progress_var.set(p))
-                self.root.after(0, lambda i=i, t=total_pages: 
-                               self.status_text.set(f"Extraction avec pypdf... Page {i}/{t}"))
-                
-                text += f"\n{'='*60}\nPAGE {i}\n{'='*60}\n\n"
-                text += page.extract_text()
-                text += "\n"
-            
-            return text
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Erreur pypdf", str(e)))
-            return None
+    def report_progress(self, pages_done, total_pages, method):
+        """Reçoit l'avancement du moteur (thread d'extraction) et met à jour l'interface"""
+        value = 10 + (80 * pages_done / total_pages)
+        label = "automatique" if method == "auto" else f"avec {method}"
+        self.root.after(0, lambda: self.progress_var.set(value))
+        memory = memory_summary(children=True)
+        self.root.after(0, lambda: self.status_text.set(
+            f"Extraction {label}... Page {pages_done}/{total_pages}"))
+        self.root.after(0, lambda: self.memory_text.set(memory))
+        self.root.after(0, self.refresh_view)
     
-    def extract_with_pdfplumber(self):
-        """Extrait avec pdfplumber"""
-        try:
-            import pdfplumber
-        except ImportError:
-            return None
+    def show_pages(self, first_page):
+        """Affiche PAGES_PER_VIEW pages à partir de first_page, relues depuis le texte extrait"""
+        page_count = len(self.spool) if self.spool is not None else 0
+        first_page = max(1, min(first_page, page_count - PAGES_PER_VIEW + 1))
+        self.view_start = first_page
+        self.view_stop = min(first_page + PAGES_PER_VIEW, page_count + 1)
         
+        self.text_area.delete(1.0, tk.END)
+        self.text_area.insert(1.0, "".join(self.spool.page(page_num)
+                                           for page_num in range(self.view_start, self.view_stop)))
+        self.page_entry.set(str(first_page) if page_count else "")
+        self.page_count_text.set(f"/ {page_count}")
+    
+    def refresh_view(self):
+        """Complète l'affichage tant que la fenêtre de pages n'est pas pleine"""
+        if self.spool is None:
+            return
+        page_count = len(self.spool)
+        self.page_count_text.set(f"/ {page_count}")
+        if self.view_stop - self.view_start < PAGES_PER_VIEW and page_count >= self.view_stop:
+            self.show_pages(self.view_start)
+    
+    def jump_to_page(self):
+        """Affiche la page saisie"""
         try:
-            text = ""
-            with pdfplumber.open(self.pdf_path.get()) as pdf:
-                total_pages = len(pdf.pages)
-                
-                for i, page in enumerate(pdf.pages, 1):
-                    progress = 10 + (80 * i / total_pages)
-                    self.root.after(0, lambda p=progress: self.progress_var.set(p))
-                    self.root.after(0, lambda i=i, t=total_pages: 
-                                   self.status_text.set(f"Extraction avec pdfplumber... Page {i}/{t}"))
-                    
-                    text += f"\n{'='*60}\nPAGE {i}\n{'='*60}\n\n"
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text
-                    text += "\n"
-            
-            return text
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Erreur pdfplumber", str(e)))
-            return None
+            page_num = int(self.page_entry.get())
+        except ValueError:
+            return
+        self.show_pages(page_num)
     
     def show_library_error(self):
         """Affiche un message d'erreur pour les bibliothèques manquantes"""
@@ -303,7 +439,7 @@ class PDFExtractorGUI:
     
     def save_text(self):
         """Sauvegarde le texte extrait"""
-        if not self.extracted_text:
+        if self.spool is None or len(self.spool) == 0 or self.is_extracting:
             messagebox.showwarning("Attention", "Aucun texte à sauvegarder")
             return
         
@@ -313,8 +449,7 @@ class PDFExtractorGUI:
             return
         
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(self.extracted_text)
+            self.spool.save(output_file)
             
             messagebox.showinfo("Succès", f"Texte sauvegardé dans:\n{output_file}")
             self.status_text.set(f"Texte sauvegardé: {Path(output_file).name}")
@@ -323,21 +458,1363 @@ class PDFExtractorGUI:
     
     def clear_all(self):
         """Efface tout"""
+        if self.is_extracting:
+            messagebox.showinfo("Info", "Une extraction est en cours")
+            return
         if messagebox.askyesno("Confirmation", "Effacer tous les champs et le texte extrait?"):
             self.pdf_path.set("")
             self.output_path.set("")
+            if self.spool is not None:
+                self.spool.close()
+                self.spool = None
             self.text_area.delete(1.0, tk.END)
-            self.extracted_text = ""
+            self.page_entry.set("")
+            self.page_count_text.set("/ 0")
             self.progress_var.set(0)
             self.status_text.set("Prêt")
             self.info_label.config(text="Aucun fichier chargé")
             self.save_button.config(state='disabled')
+            self.spool_source = None
+    
+    def open_search(self):
+        """Ouvre la fenêtre de recherche dans les textes déjà extraits"""
+        if self.search_window is not None and self.search_window.winfo_exists():
+            self.search_window.lift()
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Rechercher dans les PDF extraits")
+        window.geometry("700x400")
+        window.columnconfigure(0, weight=1)
+        window.rowconfigure(1, weight=1)
+        self.search_window = window
+        
+        query_frame = ttk.Frame(window, padding="10 10 10 5")
+        query_frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        query_frame.columnconfigure(0, weight=1)
+        query_entry = ttk.Entry(query_frame, textvariable=self.search_query)
+        query_entry.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
+        query_entry.bind('<Return>', lambda event: self.run_search())
+        query_entry.focus_set()
+        ttk.Button(query_frame, text="Rechercher", command=self.run_search).grid(row=0, column=1)
+        
+        results_frame = ttk.Frame(window, padding="10 0 10 0")
+        results_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        results_frame.columnconfigure(0, weight=1)
+        results_frame.rowconfigure(0, weight=1)
+        self.search_results = tk.Listbox(results_frame, font=('Courier', 9))
+        self.search_results.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL,
+                                  command=self.search_results.yview)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.search_results.config(yscrollcommand=scrollbar.set)
+        self.search_results.bind('<Double-Button-1>', lambda event: self.show_search_hit())
+        
+        self.search_status = ttk.Label(window, text="Double-cliquez sur un résultat pour "
+                                                    "l'afficher", padding="10 5 10 10")
+        self.search_status.grid(row=2, column=0, sticky=tk.W)
+    
+    def run_search(self):
+        """Cherche la saisie dans l'index et affiche les pages trouvées"""
+        # Connexion propre à l'interface : l'index peut être en cours
+        # d'écriture par le thread d'extraction
+        index = SearchIndex()
+        try:
+            start = time.perf_counter()
+            self.search_hits = index.search(self.search_query.get())
+            elapsed = time.perf_counter() - start
+        except ValueError as e:
+            self.search_status.config(text=str(e))
+            return
+        finally:
+            index.close()
+        
+        self.search_results.delete(0, tk.END)
+        for path, page_num, snippet in self.search_hits:
+            self.search_results.insert(tk.END, f"{Path(path).name} p.{page_num} : {snippet}")
+        self.search_status.config(text=f"{len(self.search_hits)} résultats en "
+                                       f"{elapsed * 1000:.1f} ms")
+    
+    def show_search_hit(self):
+        """
+        Affiche la page du résultat choisi si son texte est dans la visionneuse,
+        sinon sélectionne le PDF pour l'extraire
+        """
+        selection = self.search_results.curselection()
+        if not selection:
+            return
+        path, page_num, _ = self.search_hits[selection[0]]
+        if (self.spool_source == (path, None) and self.spool is not None
+                and page_num <= len(self.spool)):
+            self.show_pages(page_num)
+            self.status_text.set(f"Résultat : {Path(path).name}, page {page_num}")
+        elif self.is_extracting:
+            self.status_text.set(f"Résultat : {Path(path).name}, page {page_num} "
+                                 f"(extraction en cours)")
+        else:
+            self.pdf_path.set(path)
+            self.output_path.set(str(Path(path).with_name(f"{Path(path).stem}_text.txt")))
+            self.status_text.set(f"Fichier sélectionné: {Path(path).name} "
+                                 f"(page {page_num}, à extraire)")
+
+
+# Mémoire
+
+def peak_rss_mb(children=False):
+    """Retourne le pic de mémoire résidente (RSS) en MB, ou None si indisponible"""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en Ko ailleurs
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+def current_rss_mb():
+    """Retourne la mémoire résidente actuelle en MB (à défaut, le pic)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+def memory_summary(children=False):
+    """Décrit la mémoire actuelle et maximale (et celle des processus fils)"""
+    current, peak = current_rss_mb(), peak_rss_mb()
+    if current is None:
+        return ""
+    summary = f"Mémoire : {current:.0f} MB"
+    if peak is not None:
+        summary += f" (max {peak:.0f} MB)"
+    if children and peak_rss_mb(children=True):
+        summary += f" | processus : max {peak_rss_mb(children=True):.0f} MB"
+    return summary
+
+# Texte extrait conservé page par page
+
+# Nombre de pages chargées à la fois dans la zone de texte de l'interface
+PAGES_PER_VIEW = 5
+
+class PageSpool:
+    """
+    Texte extrait conservé dans un fichier temporaire avec la position de
+    chaque page : write_pages y écrit chaque page d'un seul appel à write(),
+    et page() en relit une à la demande sans garder le document en mémoire.
+    Écrit par le thread d'extraction et lu par celui de l'interface.
+    """
+    
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.offsets = []  # (position, longueur) en octets de chaque page
+        self.lock = threading.Lock()
+    
+    def write(self, page_chunk):
+        """Ajoute le texte d'une page (séparateur compris)"""
+        data = page_chunk.encode('utf-8')
+        with self.lock:
+            self.file.seek(0, os.SEEK_END)
+            self.offsets.append((self.file.tell(), len(data)))
+            self.file.write(data)
+    
+    def flush(self):
+        """Rien à faire : le fichier temporaire n'a pas besoin d'être à jour sur le disque"""
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    def page(self, page_num):
+        """Retourne le texte de la page page_num (à partir de 1)"""
+        with self.lock:
+            offset, length = self.offsets[page_num - 1]
+            self.file.seek(offset)
+            return self.file.read(length).decode('utf-8')
+    
+    def save(self, output_path):
+        """Enregistre tout le texte dans un fichier, page par page"""
+        with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            for page_num in range(1, len(self) + 1):
+                f.write(self.page(page_num))
+    
+    def close(self):
+        """Supprime le fichier temporaire"""
+        self.file.close()
+
+# Cache des extractions
+
+CACHE_VERSION = 1
+# Taille maximale du cache (Mo) avant éviction des pages les moins récemment utilisées
+DEFAULT_CACHE_SIZE_MB = 500
+
+def file_sha256(file_path):
+    """Retourne l'empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_dir():
+    """Retourne le dossier du cache des extractions"""
+    if os.environ.get("EXTRACT_PDF_TEXT_CACHE"):
+        return os.environ["EXTRACT_PDF_TEXT_CACHE"]
+    if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+        return os.path.join(os.environ["LOCALAPPDATA"], "extract_pdf_text")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "extract_pdf_text")
+
+def engine_version(method):
+    """
+    Version de la méthode d'extraction, qui fait partie de la clé du cache :
+    une mise à jour de pypdf ou pdfplumber invalide les textes en cache.
+    """
+    import importlib.metadata
+    names = ("pypdf", "pdfplumber") if method == "auto" else (method,)
+    versions = []
+    for name in names:
+        try:
+            versions.append(f"{name} {importlib.metadata.version(name)}")
+        except importlib.metadata.PackageNotFoundError:
+            versions.append(f"{name} absent")
+    return f"{CACHE_VERSION}; " + ", ".join(versions)
+
+class ExtractionCache:
+    """
+    Cache SQLite du texte des pages, indexé par empreinte du contenu du
+    fichier, numéro de page, méthode et version de la méthode. Au-delà de
+    max_size_mb, les pages les moins récemment utilisées sont supprimées.
+    """
+    
+    def __init__(self, path=None, max_size_mb=DEFAULT_CACHE_SIZE_MB):
+        if path is None:
+            os.makedirs(cache_dir(), exist_ok=True)
+            path = os.path.join(cache_dir(), "cache.sqlite3")
+        self.path = path
+        self.max_bytes = max_size_mb * 1024 * 1024
+        # L'interface utilise le cache depuis un thread d'extraction différent
+        # à chaque fois, jamais depuis deux threads à la fois
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS pages (sha256 TEXT, page INTEGER, method TEXT, "
+                "version TEXT, engine TEXT, text TEXT, size INTEGER, last_used REAL, "
+                "PRIMARY KEY (sha256, page, method, version))")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents (sha256 TEXT PRIMARY KEY, "
+                "page_count INTEGER)")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+    
+    def close(self):
+        """Ferme la base"""
+        self.connection.close()
+    
+    def page_count(self, sha256):
+        """Nombre de pages du document, ou None s'il n'a jamais été extrait"""
+        row = self.connection.execute("SELECT page_count FROM documents WHERE sha256 = ?",
+                                      (sha256,)).fetchone()
+        return row[0] if row else None
+    
+    def load(self, sha256, method, version):
+        """Retourne {numéro de page: (texte, bibliothèque)} et marque ces pages utilisées"""
+        with self.connection:
+            self.connection.execute(
+                "UPDATE pages SET last_used = ? WHERE sha256 = ? AND method = ? AND version = ?",
+                (time.time(), sha256, method, version))
+            rows = self.connection.execute(
+                "SELECT page, text, engine FROM pages "
+                "WHERE sha256 = ? AND method = ? AND version = ?",
+                (sha256, method, version)).fetchall()
+        return {page: (text, engine) for page, text, engine in rows}
+    
+    def store(self, sha256, method, version, pages, page_count=None):
+        """Enregistre des pages [(numéro, texte, bibliothèque)] et le nombre de pages"""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(sha256, page_num, method, version, engine, page_text,
+                  len(page_text.encode('utf-8')), now)
+                 for page_num, page_text, engine in pages])
+            if page_count is not None:
+                self.connection.execute("INSERT OR REPLACE INTO documents VALUES (?, ?)",
+                                        (sha256, page_count))
+    
+    def evict(self):
+        """Supprime les pages les moins récemment utilisées au-delà de la taille maximale"""
+        with self.connection:
+            total = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            excess = total - self.max_bytes
+            removed = 0
+            rows = self.connection.execute(
+                "SELECT rowid, size FROM pages ORDER BY last_used").fetchall()
+            stale = []
+            for rowid, size in rows:
+                if removed >= excess:
+                    break
+                stale.append((rowid,))
+                removed += size
+            self.connection.executemany("DELETE FROM pages WHERE rowid = ?", stale)
+            self.connection.execute(
+                "DELETE FROM documents WHERE sha256 NOT IN (SELECT DISTINCT sha256 FROM pages)")
+
+# Index de recherche plein texte
+
+# Nombre de résultats affichés par recherche
+DEFAULT_SEARCH_LIMIT = 20
+
+def search_index_path():
+    """Retourne le chemin par défaut de l'index de recherche, à côté du cache"""
+    return os.path.join(cache_dir(), "index.sqlite3")
+
+def search_terms(query):
+    """
+    Convertit une recherche saisie ("facture 2023", "factur*") en requête
+    FTS5 : tous les mots doivent figurer dans la page, un * final cherche
+    les mots commençant ainsi. Les autres caractères spéciaux sont ignorés.
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    if not terms:
+        raise ValueError("Recherche vide")
+    return " ".join(terms)
+
+class SearchIndex:
+    """
+    Index SQLite FTS5 du texte des pages extraites, avec le chemin du PDF et
+    le numéro de page. Un document n'est réindexé que si son contenu a changé
+    depuis sa dernière extraction complète.
+    """
+    
+    def __init__(self, path=None):
+        if path is None:
+            path = search_index_path()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        # Comme pour le cache : un thread d'extraction à la fois
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(text, path UNINDEXED, "
+                "page UNINDEXED, tokenize='unicode61 remove_diacritics 2')")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents (path TEXT PRIMARY KEY, sha256 TEXT, "
+                "page_count INTEGER, indexed REAL)")
+    
+    def close(self):
+        """Ferme la base"""
+        self.connection.close()
+    
+    def is_current(self, pdf_path, sha256):
+        """Indique si le document est déjà entièrement indexé avec ce contenu"""
+        row = self.connection.execute("SELECT sha256 FROM documents WHERE path = ?",
+                                      (os.path.abspath(pdf_path),)).fetchone()
+        return row is not None and row[0] == sha256
+    
+    def remove_document(self, pdf_path):
+        """Retire un document de l'index"""
+        path = os.path.abspath(pdf_path)
+        with self.connection:
+            self.connection.execute("DELETE FROM pages WHERE path = ?", (path,))
+            self.connection.execute("DELETE FROM documents WHERE path = ?", (path,))
+    
+    def add_pages(self, pdf_path, pages):
+        """Ajoute des pages [(numéro, texte)] d'un document"""
+        path = os.path.abspath(pdf_path)
+        with self.connection:
+            self.connection.executemany("INSERT INTO pages (text, path, page) VALUES (?, ?, ?)",
+                                        [(page_text, path, page_num)
+                                         for page_num, page_text in pages])
+    
+    def finish_document(self, pdf_path, sha256, page_count):
+        """
+        Enregistre le document indexé ; sha256 None (extraction partielle ou
+        annulée) le fera réindexer à la prochaine extraction
+        """
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                                    (os.path.abspath(pdf_path), sha256, page_count,
+                                     time.time()))
+    
+    def document_count(self):
+        """Nombre de documents indexés"""
+        return self.connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    
+    def search(self, query, limit=DEFAULT_SEARCH_LIMIT):
+        """
+        Retourne les pages les plus pertinentes pour query (voir search_terms) :
+        [(chemin du PDF, numéro de page, extrait avec les mots trouvés entre [ ])]
+        """
+        rows = self.connection.execute(
+            "SELECT path, page, snippet(pages, 0, '[', ']', '…', 12) FROM pages "
+            "WHERE pages MATCH ? ORDER BY rank LIMIT ?",
+            (search_terms(query), limit)).fetchall()
+        return [(path, page_num, " ".join(snippet.split())) for path, page_num, snippet in rows]
+
+# Moteur d'extraction (indépendant de l'interface graphique)
+
+# Nombre de lots de pages par processus (équilibre la charge entre pages
+# simples et pages chargées)
+CHUNKS_PER_JOB = 4
+
+# Tampon d'écriture du fichier texte et nombre de pages entre deux vidages
+# sur le disque (le texte déjà extrait survit à un arrêt brutal)
+WRITE_BUFFER_SIZE = 1024 * 1024
+FLUSH_INTERVAL = 50
+
+# Seuils de qualité du texte pypdf en mode automatique : part maximale de
+# caractères illisibles, et part minimale d'espaces pour un texte d'au moins
+# MIN_SPACING_LENGTH caractères
+GARBLED_RATIO = 0.05
+MIN_SPACE_RATIO = 0.05
+MIN_SPACING_LENGTH = 40
+
+# Intervalle (secondes) entre deux vérifications de l'annulation pendant
+# l'attente d'un lot de pages
+CANCEL_POLL_INTERVAL = 0.2
+
+def parse_page_ranges(text):
+    """
+    Lit une sélection de pages comme "1-20,300-310" ou "5,12-" (jusqu'à la
+    fin) et retourne [(première, dernière ou None)], numérotées à partir de 1.
+    Une sélection vide signifie tout le document (None). Lève ValueError si
+    la sélection est mal écrite.
+    """
+    if not text or not text.strip():
+        return None
+    page_ranges = []
+    for item in text.replace(" ", "").split(","):
+        first, separator, last = item.partition("-")
+        try:
+            first = int(first)
+            last = (int(last) if last else None) if separator else first
+        except ValueError:
+            raise ValueError(f"Sélection de pages invalide : \"{item}\" "
+                             f"(exemple : 1-20,300-310)") from None
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"Sélection de pages invalide : \"{item}\"")
+        page_ranges.append((first, last))
+    return page_ranges
+
+def page_indices(page_ranges, total_pages):
+    """
+    Retourne les indices (à partir de 0), triés et sans doublon, des pages
+    sélectionnées par page_ranges (None : toutes) parmi total_pages
+    """
+    if page_ranges is None:
+        return list(range(total_pages))
+    indices = sorted({index for first, last in page_ranges
+                      for index in range(first - 1, min(last or total_pages, total_pages))})
+    if not indices and total_pages:
+        raise ValueError(f"Aucune page sélectionnée : le document a {total_pages} pages")
+    return indices
+
+def page_header(page_num):
+    """Retourne le séparateur placé avant le texte d'une page"""
+    return f"\n{'='*60}\nPAGE {page_num}\n{'='*60}\n\n"
+
+def format_page(page_num, page_text):
+    """Retourne le texte d'une page précédé de son séparateur"""
+    return page_header(page_num) + page_text + "\n"
+
+def format_pages(page_texts):
+    """Assemble les textes des pages, dans l'ordre, avec leurs séparateurs"""
+    return "".join(format_page(i, page_text) for i, page_text in enumerate(page_texts, 1))
+
+def import_engine(name):
+    """
+    Importe la bibliothèque d'extraction name ("pypdf" ou "pdfplumber") et
+    note la durée du premier import (ImportError si elle est absente)
+    """
+    # __import__ attend la fin d'un import commencé par un autre thread
+    first = name not in sys.modules
+    start = time.perf_counter()
+    module = __import__(name)
+    if first:
+        record_timing(f"import {name}", start)
+    return module
+
+def warm_engine(method):
+    """Importe à l'avance les bibliothèques de la méthode, en ignorant celles absentes"""
+    for name in (("pypdf", "pdfplumber") if method == "auto" else (method,)):
+        try:
+            import_engine(name)
+        except ImportError:
+            pass
+
+@contextlib.contextmanager
+def open_document(pdf_path, method):
+    """Ouvre le PDF avec pypdf ou pdfplumber et fournit la liste de ses pages"""
+    if method == "pdfplumber":
+        with import_engine("pdfplumber").open(pdf_path) as pdf:
+            yield pdf.pages
+    else:
+        yield import_engine("pypdf").PdfReader(pdf_path).pages
+
+def is_poor_text(page_text):
+    """
+    Indique si le texte d'une page extrait par pypdf est de mauvaise
+    qualité : vide, avec trop de caractères illisibles, ou sans espaces
+    entre les mots.
+    """
+    text = page_text.strip()
+    if not text:
+        return True
+    garbled = sum(1 for char in text
+                  if char == "\ufffd" or "\ue000" <= char <= "\uf8ff"
+                  or (char < " " and char not in "\n\r\t"))
+    if garbled > GARBLED_RATIO * len(text):
+        return True
+    if len(text) >= MIN_SPACING_LENGTH:
+        spaces = sum(1 for char in text if char.isspace())
+        if spaces < MIN_SPACE_RATIO * len(text):
+            return True
+    return False
+
+def page_text(pages, index, method):
+    """
+    Extrait le texte d'une page. Avec pdfplumber, les objets de mise en page
+    de la page sont libérés aussitôt : sans cela, pdfminer les garde pour
+    chaque page visitée et la mémoire croît avec la longueur du document.
+    """
+    page = pages[index]
+    try:
+        return page.extract_text() or ""
+    finally:
+        if method == "pdfplumber":
+            page.close()
+
+@contextlib.contextmanager
+def open_extractor(pdf_path, method):
+    """
+    Fournit (nombre de pages, fonction extract(indice) -> (texte, bibliothèque)).
+    En mode "auto", chaque page est extraite par pypdf et seules les pages
+    de mauvaise qualité (voir is_poor_text) sont reprises par pdfplumber,
+    ouvert seulement au premier besoin.
+    """
+    if method == "auto":
+        try:
+            import_engine("pypdf")
+        except ImportError:
+            method = "pdfplumber"
+    if method != "auto":
+        with open_document(pdf_path, method) as pages:
+            yield len(pages), lambda index: (page_text(pages, index, method), method)
+        return
+    
+    with contextlib.ExitStack() as stack:
+        pages = stack.enter_context(open_document(pdf_path, "pypdf"))
+        precise = {}
+        
+        def extract(index):
+            fast_text = page_text(pages, index, "pypdf")
+            if not is_poor_text(fast_text):
+                return fast_text, "pypdf"
+            if "pages" not in precise:
+                try:
+                    precise["pages"] = stack.enter_context(open_document(pdf_path, "pdfplumber"))
+                except ImportError:
+                    precise["pages"] = None
+            if precise["pages"] is None:
+                return fast_text, "pypdf"
+            precise_text = page_text(precise["pages"], index, "pdfplumber")
+            if not precise_text.strip() and fast_text.strip():
+                return fast_text, "pypdf"
+            return precise_text, "pdfplumber"
+        
+        yield len(pages), extract
+
+# Signal d'annulation partagé avec le processus parent (voir _init_chunk_worker)
+_cancel_event = None
+
+def _init_chunk_worker(cancel_event):
+    """
+    Prépare un processus d'extraction : l'annulation passe par cancel_event,
+    Ctrl+C n'est traité que par le processus parent
+    """
+    global _cancel_event
+    _cancel_event = cancel_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _extract_chunk_worker(pdf_path, method, indices):
+    """
+    Extrait les pages d'indices indices ; chaque processus ouvre lui-même le
+    fichier. Sur annulation, retourne les pages déjà extraites du lot.
+    """
+    chunk = []
+    with open_extractor(pdf_path, method) as (total_pages, extract):
+        for index in indices:
+            if _cancel_event is not None and _cancel_event.is_set():
+                break
+            chunk.append(extract(index))
+    return chunk
+
+def _iter_extracted(pdf_path, method, jobs, progress, cached, page_ranges=None, cancel=None):
+    """
+    Extrait les pages sélectionnées absentes de cached ({numéro: (texte,
+    bibliothèque)}) et retourne le nombre de pages du document
+    """
+    with open_extractor(pdf_path, method) as (total_pages, extract):
+        indices = page_indices(page_ranges, total_pages)
+        if jobs <= 1 or len(indices) < 2:
+            for done, index in enumerate(indices, 1):
+                if cancel is not None and cancel.is_set():
+                    break
+                if index + 1 in cached:
+                    page_text, engine = cached[index + 1]
+                else:
+                    page_text, engine = extract(index)
+                if progress is not None:
+                    progress(done, len(indices))
+                yield index + 1, page_text, engine
+            return total_pages
+    
+    chunk_size = max(1, -(-len(indices) // (jobs * CHUNKS_PER_JOB)))
+    chunks = [indices[start:start + chunk_size] for start in range(0, len(indices), chunk_size)]
+    import multiprocessing
+    from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError
+    cancel_event = multiprocessing.Event()
+    
+    def stop_workers():
+        # Les lots en attente sont abandonnés, ceux en cours s'arrêtent à la
+        # fin de leur page et rendent les pages déjà extraites
+        if not cancel_event.is_set():
+            cancel_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_chunk_worker,
+                             initargs=(cancel_event,)) as executor:
+        # Les lots sont relus dans l'ordre, même s'ils se terminent dans le désordre
+        futures = [executor.submit(_extract_chunk_worker, pdf_path, method, chunk)
+                   if any(index + 1 not in cached for index in chunk) else None
+                   for chunk in chunks]
+        done = 0
+        for chunk, future in zip(chunks, futures):
+            if future is None:
+                results = [cached[index + 1] for index in chunk]
+            else:
+                while True:
+                    try:
+                        results = future.result(timeout=CANCEL_POLL_INTERVAL)
+                        break
+                    except TimeoutError:
+                        if cancel is not None and cancel.is_set():
+                            stop_workers()
+                    except CancelledError:
+                        results = []
+                        break
+            for index, (page_text, engine) in zip(chunk, results):
+                yield index + 1, page_text, engine
+            done += len(results)
+            if progress is not None:
+                progress(done, len(indices))
+            if cancel is not None and cancel.is_set():
+                stop_workers()
+                break
+    return total_pages
+
+def iter_pages(pdf_path, method="auto", jobs=1, progress=None, cache=None,
+               page_ranges=None, cancel=None):
+    """
+    Produit (numéro de page, texte, bibliothèque) dans l'ordre des pages, au
+    fur et à mesure de l'extraction. Avec jobs > 1, les pages sont réparties
+    par lots entre plusieurs processus. progress est appelé avec (pages
+    traitées, nombre de pages à extraire).
+    page_ranges limite l'extraction à certaines pages (voir parse_page_ranges).
+    Dès que cancel (threading.Event) est activé, l'extraction s'arrête après
+    la page en cours : les pages déjà produites restent valables.
+    Avec un ExtractionCache, les pages déjà extraites sont relues depuis le
+    cache ; si toutes le sont, le PDF n'est même pas ouvert.
+    """
+    if cache is None:
+        yield from _iter_extracted(pdf_path, method, jobs, progress, {}, page_ranges, cancel)
+        return
+    
+    sha256 = file_sha256(pdf_path)
+    version = engine_version(method)
+    total_pages = cache.page_count(sha256)
+    cached = cache.load(sha256, method, version)
+    if total_pages is not None:
+        indices = page_indices(page_ranges, total_pages)
+        if all(index + 1 in cached for index in indices):
+            for done, index in enumerate(indices, 1):
+                if cancel is not None and cancel.is_set():
+                    break
+                page_text, engine = cached[index + 1]
+                if progress is not None:
+                    progress(done, len(indices))
+                yield index + 1, page_text, engine
+            return
+    
+    new_pages = []
+    extracted = _iter_extracted(pdf_path, method, jobs, progress, cached, page_ranges, cancel)
+    while True:
+        try:
+            page_num, page_text, engine = next(extracted)
+        except StopIteration as end:
+            total_pages = end.value
+            break
+        if page_num not in cached:
+            new_pages.append((page_num, page_text, engine))
+            if len(new_pages) >= FLUSH_INTERVAL:
+                cache.store(sha256, method, version, new_pages)
+                new_pages = []
+        yield page_num, page_text, engine
+    cache.store(sha256, method, version, new_pages, page_count=total_pages)
+    cache.evict()
+
+def extract_pages(pdf_path, method="auto", jobs=1, progress=None, cache=None,
+                  page_ranges=None, cancel=None):
+    """Retourne la liste des textes des pages (voir iter_pages)"""
+    return [page_text for _, page_text, _ in iter_pages(pdf_path, method, jobs, progress,
+                                                        cache, page_ranges, cancel)]
+
+def describe_engines(engine_pages):
+    """Décrit les bibliothèques utilisées à partir du nombre de pages de chacune"""
+    if len(engine_pages) <= 1:
+        return next(iter(engine_pages), "aucune page")
+    return ", ".join(f"{engine} ({count} pages)" for engine, count in sorted(engine_pages.items()))
+
+def write_pages(pdf_path, output, method="auto", jobs=1, progress=None, cache=None,
+                page_ranges=None, cancel=None, index=None):
+    """
+    Écrit le texte du PDF page par page dans le flux texte output (un appel à
+    write() par page), au fur et à mesure de l'extraction. progress est appelé avec (pages traitées,
+    nombre de pages à extraire, méthode). page_ranges et cancel : voir
+    iter_pages. Avec un SearchIndex, les pages sont aussi indexées, sauf si
+    le document l'est déjà avec le même contenu. Retourne (caractères écrits,
+    description des bibliothèques utilisées) ; lève ImportError si aucune
+    bibliothèque n'est installée.
+    """
+    page_progress = None
+    if progress is not None:
+        page_progress = lambda pages_done, total_pages: progress(pages_done, total_pages, method)
+    sha256 = file_sha256(pdf_path) if index is not None else None
+    indexing = index is not None and not index.is_current(pdf_path, sha256)
+    if indexing:
+        index.remove_document(pdf_path)
+    characters = 0
+    engine_pages = {}
+    new_pages = []
+    pages_done = 0
+    pages = iter_pages(pdf_path, method, jobs, page_progress, cache, page_ranges, cancel)
+    for pages_done, (page_num, page_text, engine) in enumerate(pages, 1):
+        page_chunk = format_page(page_num, page_text)
+        output.write(page_chunk)
+        characters += len(page_chunk)
+        engine_pages[engine] = engine_pages.get(engine, 0) + 1
+        if indexing:
+            new_pages.append((page_num, page_text))
+        if pages_done % FLUSH_INTERVAL == 0:
+            output.flush()
+            if new_pages:
+                index.add_pages(pdf_path, new_pages)
+                new_pages = []
+    if indexing:
+        index.add_pages(pdf_path, new_pages)
+        complete = page_ranges is None and not (cancel is not None and cancel.is_set())
+        index.finish_document(pdf_path, sha256 if complete else None, pages_done)
+    return characters, describe_engines(engine_pages)
+
+def extract_text(pdf_path, method="auto", jobs=1, progress=None, cache=None,
+                 page_ranges=None, cancel=None):
+    """Extrait le texte d'un PDF en mémoire ; retourne (texte, bibliothèque utilisée)"""
+    buffer = io.StringIO()
+    _, used_method = write_pages(pdf_path, buffer, method, jobs, progress, cache,
+                                 page_ranges, cancel)
+    return buffer.getvalue(), used_method
+
+class LazyOutputFile:
+    """Fichier texte de sortie ouvert seulement à la première écriture"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+    
+    def open(self):
+        """Ouvre (et vide) le fichier s'il ne l'est pas déjà"""
+        if self.file is None:
+            self.file = open(self.path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+        return self.file
+    
+    def write(self, text):
+        """Écrit du texte, en ouvrant le fichier au premier appel"""
+        return self.open().write(text)
+    
+    def flush(self):
+        """Vide le tampon sur le disque"""
+        if self.file is not None:
+            self.file.flush()
+    
+    def close(self):
+        """Ferme le fichier s'il a été ouvert"""
+        if self.file is not None:
+            self.file.close()
+
+def extract_to_file(pdf_path, output_path, method="auto", jobs=1, progress=None, cache=None,
+                    page_ranges=None, cancel=None, index=None):
+    """
+    Extrait un PDF directement dans un fichier texte, page par page, sans
+    garder le texte en mémoire ; retourne (caractères, bibliothèque).
+    output_path n'est ouvert (et vidé) qu'à l'écriture de la première page :
+    une erreur avant l'extraction (pages hors du document...) conserve le
+    fichier existant, une erreur ou une interruption ensuite laisse les pages
+    déjà extraites.
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    output = LazyOutputFile(output_path)
+    try:
+        result = write_pages(pdf_path, output, method, jobs, progress, cache, page_ranges,
+                             cancel, index)
+        output.open()  # Fichier vide si aucune page n'a été extraite
+    finally:
+        output.close()
+    return result
+
+# Extraction par lots
+
+def find_pdf_files(input_dir):
+    """Parcourt l'arborescence et retourne les PDF à traiter"""
+    pdf_files = []
+    for dirpath, dirnames, filenames in os.walk(input_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(".pdf"):
+                pdf_files.append(os.path.join(dirpath, filename))
+    return pdf_files
+
+def batch_output_path(pdf_path, input_dir, output_dir):
+    """Chemin du fichier texte, en reproduisant l'arborescence d'entrée"""
+    relative = Path(os.path.relpath(pdf_path, input_dir))
+    return str(Path(output_dir) / relative.with_name(f"{relative.stem}_text.txt"))
+
+# Cache et index de recherche ouverts une fois par processus du lot
+_worker_cache = None
+_worker_index = None
 
+def _warm_worker(method, cache_size_mb=None, index_path=None):
+    """
+    Importe une fois pour toutes les bibliothèques dans chaque processus du
+    lot, ouvre le cache (cache_size_mb None : sans cache) et l'index de
+    recherche (index_path None : sans index)
+    """
+    global _worker_cache, _worker_index
+    warm_engine(method)
+    if cache_size_mb is not None:
+        _worker_cache = ExtractionCache(max_size_mb=cache_size_mb)
+    if index_path is not None:
+        _worker_index = SearchIndex(index_path)
+
+def _extract_file_worker(pdf_path, output_path, method, page_ranges=None):
+    """Extrait un fichier du lot avec le cache et l'index du processus"""
+    return extract_to_file(pdf_path, output_path, method, cache=_worker_cache,
+                           page_ranges=page_ranges, index=_worker_index)
+
+def extract_directory(input_dir, output_dir, method="auto", jobs=1, log=print,
+                      cache_size_mb=None, page_ranges=None, index_path=None):
+    """
+    Extrait le texte de tous les PDF d'une arborescence vers output_dir.
+    Les fichiers sont répartis entre jobs processus, qui restent actifs
+    (bibliothèques déjà importées) d'un fichier à l'autre. Une erreur sur un
+    fichier n'interrompt pas le lot. Avec cache_size_mb, les fichiers
+    inchangés sont relus depuis le cache des extractions ; page_ranges
+    limite l'extraction aux mêmes pages de chaque fichier. Avec index_path,
+    les fichiers nouveaux ou modifiés sont ajoutés à l'index de recherche.
+    Retourne la liste des fichiers en échec.
+    """
+    if not os.path.isdir(input_dir):
+        raise FileNotFoundError(f"Le dossier {input_dir} n'existe pas")
+    
+    pdf_files = find_pdf_files(input_dir)
+    log(f"{len(pdf_files)} fichiers PDF à traiter avec {jobs} processus")
+    tasks = [(pdf_path, batch_output_path(pdf_path, input_dir, output_dir))
+             for pdf_path in pdf_files]
+    
+    failed = []
+    def report(pdf_path, output_path, result=None, error=None):
+        name = os.path.relpath(pdf_path, input_dir)
+        if error is not None:
+            failed.append(pdf_path)
+            log(f"Échec : {name} ({error})")
+        else:
+            log(f"{name} : {result[0]:,} caractères ({result[1]}) -> {output_path}")
+    
+    if jobs <= 1:
+        cache = ExtractionCache(max_size_mb=cache_size_mb) if cache_size_mb is not None else None
+        index = SearchIndex(index_path) if index_path is not None else None
+        for pdf_path, output_path in tasks:
+            try:
+                report(pdf_path, output_path,
+                       extract_to_file(pdf_path, output_path, method, cache=cache,
+                                       page_ranges=page_ranges, index=index))
+            except Exception as e:
+                report(pdf_path, output_path, error=e)
+        if cache is not None:
+            cache.close()
+        if index is not None:
+            index.close()
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_warm_worker,
+                                 initargs=(method, cache_size_mb, index_path)) as executor:
+            futures = {executor.submit(_extract_file_worker, pdf_path, output_path, method,
+                                       page_ranges):
+                       (pdf_path, output_path) for pdf_path, output_path in tasks}
+            for future in as_completed(futures):
+                pdf_path, output_path = futures[future]
+                try:
+                    report(pdf_path, output_path, future.result())
+                except Exception as e:
+                    report(pdf_path, output_path, error=e)
+    
+    log(f"Terminé ! {len(tasks) - len(failed)} fichiers extraits, {len(failed)} en échec")
+    peak = peak_rss_mb()
+    if peak is not None:
+        log(f"Mémoire maximale (RSS) : {peak:.0f} MB"
+            + (f" | processus : {peak_rss_mb(children=True):.0f} MB" if jobs > 1 else ""))
+    return failed
+
+# Surveillance d'un dossier de dépôt
+
+# Base d'état de la surveillance, créée dans le dossier de sortie
+WATCH_STATE_NAME = ".extract_pdf_text_watch.sqlite3"
+# Intervalle par défaut entre deux parcours du dossier (secondes)
+DEFAULT_WATCH_INTERVAL = 10
+# Délai (secondes) depuis la dernière modification avant de traiter un
+# fichier, pour ne pas lire un PDF en cours de copie
+SETTLE_SECONDS = 2
+
+def _content_digest(obj, memo):
+    """
+    Empreinte (octets) du contenu d'un objet PDF et des objets qu'il
+    référence. Les images, sans effet sur le texte, les annotations et le
+    lien vers l'arbre des pages sont ignorés. memo garde l'empreinte des
+    objets indirects déjà vus (polices partagées par toutes les pages).
+    """
+    if hasattr(obj, "idnum"):  # référence (IndirectObject)
+        key = (obj.idnum, obj.generation)
+        if key not in memo:
+            memo[key] = b""  # protège des références circulaires
+            memo[key] = _content_digest(obj.get_object(), memo)
+        return memo[key]
+    digest = hashlib.sha256()
+    if isinstance(obj, dict):
+        if obj.get("/Subtype") == "/Image":
+            return b""
+        for key in sorted(obj):
+            if key not in ("/Parent", "/Annots"):
+                digest.update(key.encode('utf-8'))
+                digest.update(_content_digest(obj.get(key), memo))
+        if hasattr(obj, "get_data"):  # flux de contenu, police intégrée, formulaire
+            digest.update(obj.get_data())
+    elif isinstance(obj, list):
+        for item in obj:
+            digest.update(_content_digest(item, memo))
+    else:
+        digest.update(repr(obj).encode('utf-8'))
+    return digest.digest()
+
+def page_content_hashes(pdf_path):
+    """
+    Retourne l'empreinte du contenu de chaque page (flux de contenu, polices,
+    formulaires, dimensions), ou None si pypdf n'est pas installé. Deux pages
+    de même empreinte donnent le même texte, quelle que soit leur position.
+    """
+    try:
+        pypdf = import_engine("pypdf")
+    except ImportError:
+        return None
+    memo = {}
+    return [_content_digest(page, memo).hex() for page in pypdf.PdfReader(pdf_path).pages]
+
+class WatchState:
+    """
+    État SQLite de la surveillance : pour chaque PDF, date de modification,
+    taille, empreinte et méthode de la dernière extraction, et texte de
+    chaque page avec l'empreinte de son contenu. Les pages d'une nouvelle
+    version sont préparées à part et ne remplacent les anciennes qu'une fois
+    le fichier texte écrit.
+    """
+    
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path, timeout=30)
+        with self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime_ns INTEGER, "
+                "size INTEGER, sha256 TEXT, method TEXT)")
+            for table in ("pages", "staged_pages"):
+                self.connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (path TEXT, page INTEGER, hash TEXT, "
+                    f"engine TEXT, text TEXT, PRIMARY KEY (path, page))")
+    
+    def close(self):
+        """Ferme la base"""
+        self.connection.close()
+    
+    def files(self):
+        """Retourne {chemin: (mtime_ns, taille, sha256, méthode)} des PDF suivis"""
+        return {path: (mtime_ns, size, sha256, method) for path, mtime_ns, size, sha256, method
+                in self.connection.execute("SELECT * FROM files")}
+    
+    def touch(self, path, mtime_ns, size):
+        """Met à jour la date et la taille d'un PDF dont le contenu n'a pas changé"""
+        with self.connection:
+            self.connection.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                                    (mtime_ns, size, path))
+    
+    def previous_hashes(self, path, method):
+        """
+        Retourne {empreinte: numéro de page} de la version déjà extraite avec
+        method ({} si le PDF est nouveau ou a été extrait avec une autre méthode)
+        """
+        return dict(self.connection.execute(
+            "SELECT pages.hash, MIN(pages.page) FROM pages JOIN files USING (path) "
+            "WHERE path = ? AND files.method = ? AND pages.hash IS NOT NULL GROUP BY pages.hash",
+            (path, method)))
+    
+    def previous_page(self, path, page_num):
+        """Retourne (texte, bibliothèque) d'une page de la version déjà extraite"""
+        return self.connection.execute("SELECT text, engine FROM pages WHERE path = ? AND page = ?",
+                                       (path, page_num)).fetchone()
+    
+    def begin(self, path):
+        """Efface les pages préparées par une mise à jour interrompue"""
+        with self.connection:
+            self.connection.execute("DELETE FROM staged_pages WHERE path = ?", (path,))
+    
+    def stage(self, path, pages):
+        """Prépare des pages [(numéro, empreinte, bibliothèque, texte)] de la nouvelle version"""
+        with self.connection:
+            self.connection.executemany("INSERT INTO staged_pages VALUES (?, ?, ?, ?, ?)",
+                                        [(path, page_num, page_hash, engine, page_text)
+                                         for page_num, page_hash, engine, page_text in pages])
+    
+    def commit(self, path, mtime_ns, size, sha256, method):
+        """Remplace la version précédente par les pages préparées"""
+        with self.connection:
+            self.connection.execute("DELETE FROM pages WHERE path = ?", (path,))
+            self.connection.execute("INSERT INTO pages SELECT * FROM staged_pages WHERE path = ?",
+                                    (path,))
+            self.connection.execute("DELETE FROM staged_pages WHERE path = ?", (path,))
+            self.connection.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                                    (path, mtime_ns, size, sha256, method))
+    
+    def remove(self, path):
+        """Oublie un PDF supprimé du dossier"""
+        with self.connection:
+            for table in ("files", "pages", "staged_pages"):
+                self.connection.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+
+def update_document(pdf_path, output_path, state, sha256, signature, method="auto", jobs=1,
+                    index=None):
+    """
+    Écrit le texte d'un PDF nouveau ou modifié. Seules les pages dont
+    l'empreinte du contenu est inconnue sont extraites ; les autres
+    reprennent le texte de la version précédente, même déplacées (pages
+    insérées ou ajoutées en fin de document). Le fichier texte n'est remplacé
+    qu'une fois complet. signature : (mtime_ns, taille) du PDF.
+    Retourne (pages extraites, nombre de pages).
+    """
+    path = os.path.abspath(pdf_path)
+    hashes = page_content_hashes(pdf_path)
+    previous = state.previous_hashes(path, method) if hashes is not None else {}
+    changed = None if hashes is None else [page_index for page_index, page_hash
+                                           in enumerate(hashes) if page_hash not in previous]
+    
+    def document_pages():
+        # (numéro, empreinte, texte, bibliothèque) de chaque page, dans l'ordre
+        if changed is None:  # sans pypdf : tout le document est extrait
+            for page_num, page_text, engine in iter_pages(pdf_path, method, jobs):
+                yield page_num, None, page_text, engine
+            return
+        page_ranges = [(page_index + 1, page_index + 1) for page_index in changed]
+        extracted = iter_pages(pdf_path, method, jobs, page_ranges=page_ranges) if changed else None
+        for page_index, page_hash in enumerate(hashes):
+            if page_hash in previous:
+                page_text, engine = state.previous_page(path, previous[page_hash])
+            else:
+                _, page_text, engine = next(extracted)
+            yield page_index + 1, page_hash, page_text, engine
+    
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    temp_path = output_path + ".tmp"
+    page_count = 0
+    staged = []
+    indexed = []
+    if index is not None:
+        index.remove_document(pdf_path)
+    try:
+        with open(temp_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            state.begin(path)
+            for page_num, page_hash, page_text, engine in document_pages():
+                f.write(format_page(page_num, page_text))
+                page_count = page_num
+                staged.append((page_num, page_hash, engine, page_text))
+                if index is not None:
+                    indexed.append((page_num, page_text))
+                if len(staged) >= FLUSH_INTERVAL:
+                    state.stage(path, staged)
+                    staged = []
+                    if index is not None:
+                        index.add_pages(pdf_path, indexed)
+                        indexed = []
+            state.stage(path, staged)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    state.commit(path, *signature, sha256, method)
+    if index is not None:
+        index.add_pages(pdf_path, indexed)
+        index.finish_document(pdf_path, sha256, page_count)
+    return (page_count if changed is None else len(changed)), page_count
+
+def watch_directory(input_dir, output_dir, method="auto", jobs=1, log=print,
+                    interval=DEFAULT_WATCH_INTERVAL, once=False, index_path=None):
+    """
+    Surveille un dossier de dépôt : à chaque parcours (toutes les interval
+    secondes, un seul avec once), les PDF nouveaux ou modifiés sont extraits
+    vers output_dir (voir update_document). Un fichier dont la date et la
+    taille n'ont pas changé n'est pas relu ; s'il est seulement recopié à
+    l'identique, son empreinte évite de l'extraire à nouveau. Un fichier en
+    échec n'est retenté qu'après modification. Avec index_path, l'index de
+    recherche suit les mêmes mises à jour.
+    """
+    if not os.path.isdir(input_dir):
+        raise FileNotFoundError(f"Le dossier {input_dir} n'existe pas")
+    os.makedirs(output_dir, exist_ok=True)
+    state = WatchState(os.path.join(output_dir, WATCH_STATE_NAME))
+    index = SearchIndex(index_path) if index_path is not None else None
+    failed = {}  # chemin -> (mtime_ns, taille) du fichier en échec
+    log(f"Surveillance de {input_dir}" + ("" if once else f" (toutes les {interval} s)"))
+    try:
+        while True:
+            known = state.files()
+            seen = set()
+            for pdf_path in find_pdf_files(input_dir):
+                path = os.path.abspath(pdf_path)
+                name = os.path.relpath(pdf_path, input_dir)
+                seen.add(path)
+                try:
+                    stat = os.stat(pdf_path)
+                except OSError:  # supprimé pendant le parcours
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+                if path in known and known[path][:2] == signature and known[path][3] == method:
+                    continue
+                if failed.get(path) == signature:
+                    continue
+                if not once and time.time() - stat.st_mtime < SETTLE_SECONDS:
+                    continue  # probablement en cours de copie : au prochain parcours
+                try:
+                    sha256 = file_sha256(pdf_path)
+                    if path in known and known[path][2:] == (sha256, method):
+                        state.touch(path, *signature)
+                        continue
+                    output_path = batch_output_path(pdf_path, input_dir, output_dir)
+                    extracted, page_count = update_document(pdf_path, output_path, state, sha256,
+                                                            signature, method, jobs, index)
+                    failed.pop(path, None)
+                    log(f"{name} : {extracted}/{page_count} pages extraites -> {output_path}")
+                except Exception as e:
+                    failed[path] = signature
+                    log(f"Échec : {name} ({e})")
+            for path in set(known) - seen:
+                state.remove(path)
+                if index is not None:
+                    index.remove_document(path)
+                log(f"{os.path.relpath(path, os.path.abspath(input_dir))} : supprimé, "
+                    f"n'est plus suivi")
+            if once:
+                break
+            time.sleep(interval)
+    finally:
+        state.close()
+        if index is not None:
+            index.close()
 
 def main():
-    root = tk.Tk()
-    app = PDFExtractorGUI(root)
-    root.mainloop()
+    """Fonction principale - choisit entre GUI et ligne de commande"""
+    record_timing("script")
+    if len(sys.argv) == 1:
+        if tk is None:
+            print("Erreur : tkinter n'est pas installé, utilisez la ligne de commande (--help)",
+                  file=sys.stderr)
+            sys.exit(1)
+        root = tk.Tk()
+        app = PDFExtractorGUI(root)
+        root.mainloop()
+        return
+    
+    parser = argparse.ArgumentParser(
+        description='Extraire le texte d\'un fichier PDF',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples d'utilisation:
+  %(prog)s                                # Lance l'interface graphique
+  %(prog)s document.pdf
+  %(prog)s document.pdf -o resultat.txt --method pdfplumber
+  %(prog)s rapport.pdf --method pdfplumber --jobs 8
+  %(prog)s rapport.pdf --pages 1-20,300-310
+  %(prog)s --batch ./archives/ -o ./textes/ --jobs 8
+  %(prog)s --batch ./archives/ -o ./textes/ --index
+  %(prog)s --search "facture 2023"
+  %(prog)s --watch ./depot/ -o ./textes/ --interval 30
+  %(prog)s document.pdf --timings
+        """
+    )
+    parser.add_argument('input_pdf', nargs='?', help='Chemin vers le fichier PDF')
+    parser.add_argument('-o', '--output',
+                        help='Fichier texte de sortie (défaut: <nom>_text.txt), '
+                             'ou dossier de sortie avec --batch et --watch')
+    parser.add_argument('--batch', metavar='DIR',
+                        help='Extraire tous les PDF du dossier (et de ses sous-dossiers)')
+    parser.add_argument('--watch', metavar='DIR',
+                        help='Surveiller le dossier et extraire les PDF nouveaux ou modifiés '
+                             '(seules les pages modifiées sont extraites à nouveau)')
+    parser.add_argument('--interval', type=float, default=DEFAULT_WATCH_INTERVAL,
+                        metavar='SECONDES',
+                        help=f'Intervalle entre deux parcours du dossier surveillé '
+                             f'(défaut: {DEFAULT_WATCH_INTERVAL})')
+    parser.add_argument('--once', action='store_true',
+                        help='Avec --watch, traiter les changements une seule fois puis quitter')
+    parser.add_argument('--method', choices=['auto', 'pypdf', 'pdfplumber'], default='auto',
+                        help='Méthode d\'extraction (défaut: auto)')
+    parser.add_argument('--pages', metavar='PAGES',
+                        help='Pages à extraire, par exemple 1-20,300-310 ou 5- '
+                             '(défaut: toutes)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Nombre de processus se partageant les pages, ou les '
+                             'fichiers avec --batch (défaut: 1)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ne pas utiliser le cache des extractions')
+    parser.add_argument('--cache-size', type=float, default=DEFAULT_CACHE_SIZE_MB, metavar='MB',
+                        help=f'Taille maximale du cache des extractions en Mo '
+                             f'(défaut: {DEFAULT_CACHE_SIZE_MB})')
+    parser.add_argument('--index', action='store_true',
+                        help='Ajouter le texte extrait à l\'index de recherche (seuls les '
+                             'fichiers nouveaux ou modifiés sont réindexés)')
+    parser.add_argument('--search', metavar='REQUÊTE',
+                        help='Chercher dans l\'index les pages contenant tous les mots '
+                             '(mot* : mots commençant ainsi)')
+    parser.add_argument('--index-file', metavar='FICHIER',
+                        help=f'Index de recherche à utiliser (défaut: {search_index_path()})')
+    parser.add_argument('--limit', type=int, default=DEFAULT_SEARCH_LIMIT,
+                        help=f'Nombre maximal de résultats de --search '
+                             f'(défaut: {DEFAULT_SEARCH_LIMIT})')
+    parser.add_argument('--timings', action='store_true',
+                        help='Afficher les durées de démarrage (chargement du script, '
+                             'import des bibliothèques) sur la sortie d\'erreur')
+    args = parser.parse_args()
+    index_path = (args.index_file or search_index_path()) if args.index or args.search else None
+    
+    if args.search:
+        try:
+            index = SearchIndex(index_path)
+            start = time.perf_counter()
+            hits = index.search(args.search, args.limit)
+            elapsed = time.perf_counter() - start
+            for path, page_num, snippet in hits:
+                print(f"{path} (page {page_num}) : {snippet}")
+            print(f"{len(hits)} résultats en {elapsed * 1000:.1f} ms "
+                  f"({index.document_count()} documents indexés)", file=sys.stderr)
+            index.close()
+        except Exception as e:
+            print(f"Erreur : {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0 if hits else 1)
+    
+    if args.jobs < 1:
+        parser.error("--jobs doit être un entier positif")
+    if not args.batch and not args.watch and not args.input_pdf:
+        parser.error("indiquer un fichier PDF, --batch DIR, --watch DIR ou --search REQUÊTE")
+    if args.watch and (args.batch or args.input_pdf or args.pages):
+        parser.error("--watch ne se combine pas avec un fichier PDF, --batch ou --pages")
+    if args.interval <= 0:
+        parser.error("--interval doit être positif")
+    try:
+        page_ranges = parse_page_ranges(args.pages)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.watch:
+        try:
+            watch_directory(args.watch, args.output or args.watch, args.method, args.jobs,
+                            interval=args.interval, once=args.once, index_path=index_path)
+        except KeyboardInterrupt:
+            print("Surveillance arrêtée", file=sys.stderr)
+        except Exception as e:
+            print(f"Erreur : {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if args.timings:
+                print(f"Démarrage : {format_timings()}", file=sys.stderr)
+        sys.exit(0)
+    
+    if args.batch:
+        try:
+            failed = extract_directory(args.batch, args.output or args.batch,
+                                       args.method, args.jobs,
+                                       cache_size_mb=None if args.no_cache else args.cache_size,
+                                       page_ranges=page_ranges, index_path=index_path)
+        except Exception as e:
+            print(f"Erreur : {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if args.timings:
+                print(f"Démarrage : {format_timings()}", file=sys.stderr)
+        sys.exit(1 if failed else 0)
+    
+    pdf_file = Path(args.input_pdf)
+    output_file = args.output or str(pdf_file.with_name(f"{pdf_file.stem}_text.txt"))
+    
+    # Premier Ctrl+C : arrêt après la page en cours, en gardant le texte déjà
+    # écrit ; le second interrompt aussitôt
+    cancel = threading.Event()
+    def interrupt(signum, frame):
+        cancel.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        print("Arrêt demandé, fin de la page en cours...", file=sys.stderr)
+    signal.signal(signal.SIGINT, interrupt)
+    
+    try:
+        if not pdf_file.exists():
+            raise FileNotFoundError(f"Le fichier {pdf_file} n'existe pas")
+        cache = None if args.no_cache else ExtractionCache(max_size_mb=args.cache_size)
+        index = SearchIndex(index_path) if index_path is not None else None
+        characters, method = extract_to_file(str(pdf_file), output_file, args.method, args.jobs,
+                                             cache=cache, page_ranges=page_ranges,
+                                             cancel=cancel, index=index)
+        if cancel.is_set():
+            print(f"Extraction interrompue : {characters:,} caractères conservés dans "
+                  f"{output_file}", file=sys.stderr)
+            sys.exit(1)
+        print(f"{characters:,} caractères extraits avec {method} : {output_file}")
+        peak = peak_rss_mb()
+        if peak is not None:
+            print(f"Mémoire maximale (RSS) : {peak:.0f} MB"
+                  + (f" | processus : {peak_rss_mb(children=True):.0f} MB" if args.jobs > 1 else ""))
+    except ImportError:
+        print("Erreur : installez pypdf ou pdfplumber (pip install pypdf pdfplumber)",
+              file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if args.timings:
+            print(f"Démarrage : {format_timings()}", file=sys.stderr)
 
 
 if __name__ == "__main__":
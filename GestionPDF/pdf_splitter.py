@@ -2,17 +2,99 @@
 """
 Script pour découper un PDF en plusieurs fichiers de taille maximale définie.
 Version avec interface graphique.
-Nécessite : pip install PyPDF2
+Nécessite : pip install PyPDF2 (et Pillow pour la recompression des images)
 """
 
+import time
+
+# Début du chargement du script, pour mesurer le temps de démarrage
+START_TIME = time.perf_counter()
+
+import collections
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import mmap
 import os
+import queue
+import re
 import sys
+import zlib
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
-from PyPDF2 import PdfReader, PdfWriter
 import argparse
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# PyPDF2 et Pillow ne sont importés qu'au premier besoin (voir load_pdf_library
+# et load_pillow) : le script démarre sans attendre leur chargement
+PdfReader = PdfWriter = None
+ArrayObject = DecodedStreamObject = DictionaryObject = EncodedStreamObject = None
+IndirectObject = NameObject = NullObject = NumberObject = None
+Image = None
+
+# Intervalle de lecture de la file d'événements de l'interface (ms)
+EVENT_POLL_MS = 100
+
+# Durées de démarrage (secondes depuis START_TIME, ou durée d'un import)
+startup_timings = {}
+
+def record_timing(name, since=None):
+    """Note la durée écoulée depuis since (par défaut, depuis le début du chargement)"""
+    startup_timings[name] = time.perf_counter() - (START_TIME if since is None else since)
+
+def format_timings():
+    """Décrit les durées de démarrage notées"""
+    return " | ".join(f"{name} : {seconds * 1000:.0f} ms"
+                      for name, seconds in startup_timings.items())
+
+# Le préchargement de l'interface et le découpage peuvent importer en même temps
+_pdf_library_lock = threading.Lock()
+
+def load_pdf_library():
+    """
+    Importe PyPDF2 au premier appel. PdfReader est affecté en dernier : un
+    appelant qui le voit défini voit aussi tous les autres noms.
+    """
+    global PdfReader, PdfWriter, ArrayObject, DecodedStreamObject, DictionaryObject
+    global EncodedStreamObject, IndirectObject, NameObject, NullObject, NumberObject
+    if PdfReader is not None:
+        return
+    with _pdf_library_lock:
+        if PdfReader is not None:
+            return
+        start = time.perf_counter()
+        with metrics.phase("import"):
+            import PyPDF2
+            from PyPDF2 import generic
+        PdfWriter = PyPDF2.PdfWriter
+        ArrayObject = generic.ArrayObject
+        DecodedStreamObject = generic.DecodedStreamObject
+        DictionaryObject = generic.DictionaryObject
+        EncodedStreamObject = generic.EncodedStreamObject
+        IndirectObject = generic.IndirectObject
+        NameObject = generic.NameObject
+        NullObject = generic.NullObject
+        NumberObject = generic.NumberObject
+        record_timing("import PyPDF2", start)
+        PdfReader = PyPDF2.PdfReader
+
+def load_pillow():
+    """Importe Pillow au premier appel ; retourne False s'il n'est pas installé"""
+    global Image
+    if Image is None:
+        try:
+            from PIL import Image
+        except ImportError:  # Pillow n'est nécessaire que pour la recompression des images
+            return False
+    return True
+
 class PDFSplitterGUI:
     def __init__(self, root):
         self.root = root
@@ -23,8 +105,17 @@ class PDFSplitterGUI:
         self.input_file = tk.StringVar()
         self.output_dir = tk.StringVar()
         self.max_size = tk.StringVar(value="20")
+        self.jobs = tk.StringVar(value="1")
+        self.split_mode = tk.StringVar(value="size")
+        self.parts_count = tk.StringVar(value="4")
+        self.speed_text = tk.StringVar()
         self.is_processing = False
         
+        # File d'événements remplie par le thread de traitement et vidée
+        # périodiquement par la boucle Tk (seul thread qui touche aux widgets)
+        self.events = queue.Queue()
+        self.start_time = None
+        
         # Style
         self.setup_styles()
         
@@ -33,6 +124,23 @@ class PDFSplitterGUI:
         
         # Centrer la fenêtre
         self.center_window()
+        
+        self.root.after(EVENT_POLL_MS, self.drain_events)
+        self.root.after(0, self.warm_up)
+    
+    def warm_up(self):
+        """
+        Appelé dès que la fenêtre est affichée : charge PyPDF2 dans un thread
+        pour que le premier découpage ne l'attende pas, puis journalise les
+        durées de démarrage.
+        """
+        record_timing("fenêtre")
+        
+        def load():
+            load_pdf_library()
+            self.log(f"Démarrage : {format_timings()}")
+        
+        threading.Thread(target=load, daemon=True).start()
     
     def setup_styles(self):
         """Configure les styles pour l'interface"""
@@ -100,6 +208,26 @@ class PDFSplitterGUI:
         ttk.Button(size_frame, text="50 Mo", width=8,
                   command=lambda: self.max_size.set("50")).grid(row=0, column=6, padx=2)
         
+        # Découpage en un nombre donné de parties équilibrées
+        ttk.Radiobutton(size_frame, text="Par taille maximale", variable=self.split_mode,
+                        value="size").grid(row=2, column=0, columnspan=2, sticky=tk.W,
+                                           pady=(10, 0))
+        ttk.Radiobutton(size_frame, text="En parties égales:", variable=self.split_mode,
+                        value="parts").grid(row=2, column=2, sticky=tk.W, padx=(30, 10),
+                                            pady=(10, 0))
+        ttk.Spinbox(size_frame, from_=2, to=1000, textvariable=self.parts_count,
+                    width=5).grid(row=2, column=3, sticky=tk.W, pady=(10, 0))
+        ttk.Radiobutton(size_frame, text="Par chapitres (signets)", variable=self.split_mode,
+                        value="outline").grid(row=2, column=4, columnspan=3, sticky=tk.W,
+                                              padx=(10, 0), pady=(10, 0))
+        
+        # Nombre de processus pour l'écriture des parties
+        ttk.Label(size_frame, text="Processus parallèles:").grid(row=1, column=0, columnspan=2,
+                                                                 sticky=tk.W, pady=(10, 0))
+        ttk.Spinbox(size_frame, from_=1, to=os.cpu_count() or 1,
+                    textvariable=self.jobs, width=5).grid(row=1, column=2, sticky=tk.W,
+                                                          padx=(30, 10), pady=(10, 0))
+        
         # Section: Dossier de sortie
         ttk.Label(main_frame, text="Dossier de sortie:", 
                  style='Header.TLabel').grid(row=5, column=0, sticky=tk.W, pady=(0, 5))
@@ -123,9 +251,17 @@ class PDFSplitterGUI:
                                         command=self.process_pdf)
         self.process_button.grid(row=7, column=0, columnspan=3, pady=20)
         
-        # Barre de progression
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
-        self.progress.grid(row=8, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
+        # Barre de progression et débit
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.grid(row=8, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
+        progress_frame.columnconfigure(0, weight=1)
+        
+        self.progress = ttk.Progressbar(progress_frame, mode='determinate', maximum=100)
+        self.progress.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        
+        ttk.Label(progress_frame, textvariable=self.speed_text,
+                 font=('Arial', 8), foreground='gray').grid(row=1, column=0, sticky=tk.W,
+                                                            pady=(2, 0))
         
         # Zone de log
         ttk.Label(main_frame, text="Journal d'exécution:", 
@@ -160,10 +296,54 @@ class PDFSplitterGUI:
             self.output_dir.set(dirname)
     
     def log(self, message):
-        """Ajoute un message dans la zone de log"""
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.root.update()
+        """Ajoute un message dans la zone de log (utilisable depuis n'importe quel thread)"""
+        self.events.put(("log", message))
+    
+    def report_progress(self, pages_done, total_pages, bytes_written):
+        """Transmet l'avancement du découpage (depuis n'importe quel thread)"""
+        self.events.put(("progress", (pages_done, total_pages, bytes_written)))
+    
+    def post(self, callback):
+        """Exécute callback dans la boucle Tk (depuis n'importe quel thread)"""
+        self.events.put(("call", callback))
+    
+    def drain_events(self):
+        """
+        Vide la file d'événements : les messages en attente sont ajoutés au
+        journal en une seule insertion et seul le dernier avancement est affiché.
+        """
+        messages = []
+        last_progress = None
+        callbacks = []
+        try:
+            while True:
+                kind, value = self.events.get_nowait()
+                if kind == "log":
+                    messages.append(value)
+                elif kind == "progress":
+                    last_progress = value
+                else:
+                    callbacks.append(value)
+        except queue.Empty:
+            pass
+        
+        if messages:
+            self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+            self.log_text.see(tk.END)
+        if last_progress is not None:
+            self.show_progress(*last_progress)
+        for callback in callbacks:
+            callback()
+        
+        self.root.after(EVENT_POLL_MS, self.drain_events)
+    
+    def show_progress(self, pages_done, total_pages, bytes_written):
+        """Met à jour la barre de progression et le débit"""
+        self.progress['value'] = 100 * pages_done / max(total_pages, 1)
+        elapsed = max(time.monotonic() - self.start_time, 1e-6)
+        self.speed_text.set(f"{pages_done}/{total_pages} pages | "
+                            f"{pages_done / elapsed:.1f} pages/s | "
+                            f"{bytes_written / elapsed / (1024 * 1024):.2f} Mo/s")
     
     def clear_log(self):
         """Efface la zone de log"""
@@ -193,10 +373,27 @@ class PDFSplitterGUI:
             messagebox.showerror("Erreur", "La taille maximale doit être un nombre positif.")
             return
         
+        if self.split_mode.get() == "parts":
+            try:
+                if int(self.parts_count.get()) < 1:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Erreur", "Le nombre de parties doit être un entier positif.")
+                return
+        
+        try:
+            if int(self.jobs.get()) < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Erreur", "Le nombre de processus doit être un entier positif.")
+            return
+        
         # Lancer le traitement dans un thread
         self.is_processing = True
         self.process_button.config(state='disabled')
-        self.progress.start()
+        self.progress['value'] = 0
+        self.speed_text.set("")
+        self.start_time = time.monotonic()
         self.clear_log()
         
         thread = threading.Thread(target=self.split_pdf_thread)
@@ -209,141 +406,1030 @@ class PDFSplitterGUI:
             input_path = self.input_file.get()
             output_dir = self.output_dir.get() or os.path.dirname(input_path)
             max_size_mb = float(self.max_size.get())
+            jobs = int(self.jobs.get())
+            parts_count = None
+            if self.split_mode.get() == "parts":
+                parts_count = int(self.parts_count.get())
+            by = "outline" if self.split_mode.get() == "outline" else "size"
             
-            self.split_pdf_by_size(input_path, max_size_mb, output_dir)
+            self.split_pdf_by_size(input_path, max_size_mb, output_dir, jobs, parts_count, by)
             
-            self.root.after(0, lambda: messagebox.showinfo("Succès", 
-                                                          "Le PDF a été découpé avec succès!"))
+            self.post(lambda: messagebox.showinfo("Succès", 
+                                                  "Le PDF a été découpé avec succès!"))
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Erreur", 
-                                                           f"Une erreur est survenue:\n{str(e)}"))
-            self.log(f"Erreur: {str(e)}")
+            error = str(e)
+            self.post(lambda: messagebox.showerror("Erreur", 
+                                                   f"Une erreur est survenue:\n{error}"))
+            self.log(f"Erreur: {error}")
         finally:
             self.is_processing = False
-            self.root.after(0, lambda: self.process_button.config(state='normal'))
-            self.root.after(0, lambda: self.progress.stop())
+            self.post(lambda: self.process_button.config(state='normal'))
     
     def get_file_size_mb(self, file_path):
         """Retourne la taille du fichier en MB"""
         return os.path.getsize(file_path) / (1024 * 1024)
     
-    def split_pdf_by_size(self, input_pdf_path, max_size_mb, output_dir):
+    def split_pdf_by_size(self, input_pdf_path, max_size_mb, output_dir, jobs=1,
+                          parts_count=None, by="size"):
         """Découpe un PDF en plusieurs fichiers de taille maximale définie"""
-        
-        # Créer le dossier de sortie si nécessaire
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Nom de base pour les fichiers de sortie
-        base_name = os.path.splitext(os.path.basename(input_pdf_path))[0]
-        
-        self.log(f"Lecture du PDF : {os.path.basename(input_pdf_path)}")
-        self.log(f"Taille originale : {self.get_file_size_mb(input_pdf_path):.2f} Mo")
-        self.log(f"Taille maximale par fichier : {max_size_mb} Mo")
         self.log(f"Dossier de sortie : {output_dir}")
-        self.log("-" * 60)
-        
-        # Lecture du PDF
-        reader = PdfReader(input_pdf_path)
-        total_pages = len(reader.pages)
-        
-        self.log(f"Nombre total de pages : {total_pages}")
-        self.log("")
-        
-        # Variables pour le découpage
-        current_writer = PdfWriter()
-        current_part = 1
-        current_pages = []
-        created_files = []
-        
-        for page_num in range(total_pages):
-            # Ajouter la page courante
-            page = reader.pages[page_num]
-            current_writer.add_page(page)
-            current_pages.append(page_num + 1)
-            
-            # Créer un fichier temporaire pour vérifier la taille
-            temp_filename = os.path.join(output_dir, f"temp_check.pdf")
-            with open(temp_filename, 'wb') as temp_file:
-                current_writer.write(temp_file)
-            
-            current_size_mb = self.get_file_size_mb(temp_filename)
-            
-            # Si la taille dépasse la limite ou c'est la dernière page
-            if (current_size_mb > max_size_mb and len(current_pages) > 1) or \
-               (page_num == total_pages - 1 and len(current_pages) > 0):
-                
-                # Si on dépasse la limite, retirer la dernière page ajoutée
-                if current_size_mb > max_size_mb and len(current_pages) > 1:
-                    # Recréer le writer sans la dernière page
-                    current_writer = PdfWriter()
-                    for p in current_pages[:-1]:
-                        current_writer.add_page(reader.pages[p-1])
-                    pages_range = f"{current_pages[0]}-{current_pages[-2]}"
-                    next_start = current_pages[-1]
-                else:
-                    # C'est la dernière page, on garde tout
-                    pages_range = f"{current_pages[0]}-{current_pages[-1]}"
-                    next_start = None
-                
-                # Sauvegarder le fichier
-                output_filename = f"{base_name}_partie_{current_part:03d}.pdf"
-                output_path = os.path.join(output_dir, output_filename)
-                
-                with open(output_path, 'wb') as output_file:
-                    current_writer.write(output_file)
-                
-                final_size = self.get_file_size_mb(output_path)
-                created_files.append(output_path)
-                
-                self.log(f"Créé : {output_filename}")
-                self.log(f"   Pages : {pages_range} | Taille : {final_size:.2f} Mo")
-                self.log("")
-                
-                # Préparer pour la partie suivante
-                current_writer = PdfWriter()
-                current_part += 1
-                current_pages = []
-                
-                # Si on avait retiré la dernière page, la rajouter au nouveau writer
-                if next_start and page_num < total_pages - 1:
-                    current_writer.add_page(reader.pages[page_num])
-                    current_pages.append(page_num + 1)
-            
-            # Nettoyer le fichier temporaire
-            if os.path.exists(temp_filename):
-                os.remove(temp_filename)
-        
-        # Traiter les pages restantes si nécessaire
-        if len(current_pages) > 0:
-            output_filename = f"{base_name}_partie_{current_part:03d}.pdf"
-            output_path = os.path.join(output_dir, output_filename)
-            
-            with open(output_path, 'wb') as output_file:
-                current_writer.write(output_file)
-            
-            final_size = self.get_file_size_mb(output_path)
-            created_files.append(output_path)
-            
-            pages_range = f"{current_pages[0]}-{current_pages[-1]}"
-            self.log(f"Créé : {output_filename}")
-            self.log(f"   Pages : {pages_range} | Taille : {final_size:.2f} Mo")
-            self.log("")
-        
-        self.log("-" * 60)
-        self.log(f"Terminé ! {len(created_files)} fichiers créés dans :")
-        self.log(f"{output_dir}")
+        return split_pdf_by_size(input_pdf_path, max_size_mb, output_dir, log=self.log,
+                                 jobs=jobs, parts_count=parts_count, by=by,
+                                 progress=self.report_progress, unit="Mo")
 
 # Fonctions pour utilisation en ligne de commande
 def get_file_size_mb(file_path):
     """Retourne la taille du fichier en MB"""
     return os.path.getsize(file_path) / (1024 * 1024)
 
-def split_pdf_by_size(input_pdf_path, max_size_mb=20, output_dir=None):
-    """Version ligne de commande du découpage PDF"""
+# Mesures de performance
+
+class SplitMetrics:
+    """
+    Durée cumulée de chaque phase d'un découpage et compteurs associés
+    (sérialisations, octets écrits...). Inactif tant que start() n'est pas
+    appelé ; seules les mesures du processus courant sont prises en compte.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}
+        self.counters = {}
+        self.gauges = {}
+    
+    def start(self):
+        """Active la collecte et remet les mesures à zéro"""
+        self.enabled = True
+        self.phases = {}
+        self.counters = {}
+        self.gauges = {}
+    
+    def stop(self):
+        """Désactive la collecte"""
+        self.enabled = False
+    
+    def phase(self, name):
+        """Contexte chronométrant une phase (sans effet si la collecte est inactive)"""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._timed(name)
+    
+    @contextlib.contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+    
+    def count(self, name, value=1):
+        """Incrémente un compteur"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def to_dict(self):
+        """Retourne les mesures sous forme de dictionnaire"""
+        return {
+            "phases_seconds": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+    
+    def to_prometheus(self, labels):
+        """Retourne les mesures au format texte de Prometheus"""
+        label_text = ",".join(f'{key}="{prometheus_label(value)}"'
+                              for key, value in labels.items())
+        lines = [
+            "# HELP pdf_splitter_phase_seconds Durée cumulée de chaque phase du découpage",
+            "# TYPE pdf_splitter_phase_seconds gauge",
+        ]
+        for name, seconds in self.phases.items():
+            lines.append(f'pdf_splitter_phase_seconds{{{label_text},'
+                         f'phase="{prometheus_label(name)}"}} {seconds:.6f}')
+        for name, value in self.counters.items():
+            lines.append(f"# TYPE pdf_splitter_{name}_total counter")
+            lines.append(f"pdf_splitter_{name}_total{{{label_text}}} {value}")
+        for name, value in self.gauges.items():
+            lines.append(f"# TYPE pdf_splitter_{name} gauge")
+            lines.append(f"pdf_splitter_{name}{{{label_text}}} {value}")
+        return "\n".join(lines) + "\n"
+    
+    def save(self, metrics_path, metrics_format="json", labels=None):
+        """Enregistre les mesures au format json ou prometheus"""
+        labels = labels or {}
+        with open(metrics_path, 'w', encoding='utf-8') as f:
+            if metrics_format == "prometheus":
+                f.write(self.to_prometheus(labels))
+            else:
+                json.dump(dict(labels, **self.to_dict()), f, ensure_ascii=False, indent=2)
+
+def prometheus_label(value):
+    """Échappe une valeur d'étiquette Prometheus (barre oblique inverse, guillemet, saut de ligne)"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Mesures du découpage en cours (processus courant)
+metrics = SplitMetrics()
+
+def finish_metrics(metrics_path, metrics_format, file_label, run_start, log=print):
+    """
+    Arrête la collecte des mesures démarrée à run_start, les enregistre dans
+    metrics_path et affiche la durée de chaque phase
+    """
+    metrics.stop()
+    metrics.phases["total"] = time.perf_counter() - run_start
+    peak = peak_rss_mb()
+    if peak is not None:
+        metrics.gauges["peak_rss_bytes"] = int(peak * 1024 * 1024)
+    metrics.save(metrics_path, metrics_format, {"file": file_label})
+    log("Durée par phase :")
+    for name, seconds in sorted(metrics.phases.items(), key=lambda item: -item[1]):
+        log(f"   {name:<12} {seconds:8.3f} s")
+    log(f"Sérialisations : {metrics.counters.get('serializations', 0)} | "
+        f"Octets écrits : {metrics.counters.get('bytes_written', 0)}")
+    log(f"Mesures enregistrées : {metrics_path}")
+
+# Mémoire
+
+# Nombre de pages analysées entre deux libérations des objets en mode mémoire réduite
+LOW_MEMORY_RELEASE_INTERVAL = 100
+
+def peak_rss_mb(children=False):
+    """Retourne le pic de mémoire résidente (RSS) en MB, ou None si indisponible"""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en Ko ailleurs
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+def current_rss_mb():
+    """Retourne la mémoire résidente actuelle en MB (à défaut, le pic)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+def check_memory(max_rss_mb):
+    """Interrompt le traitement si la mémoire utilisée dépasse max_rss_mb"""
+    if max_rss_mb is None:
+        return
+    rss = current_rss_mb()
+    if rss is not None and rss > max_rss_mb:
+        raise MemoryError(f"Mémoire utilisée ({rss:.0f} MB) supérieure à la limite "
+                          f"--max-rss ({max_rss_mb:.0f} MB)")
+
+def open_reader(input_pdf_path, low_memory=False):
+    """
+    Ouvre le PDF source. PyPDF2 charge normalement tout le fichier en
+    mémoire ; en mode mémoire réduite il est lu à la demande depuis le disque.
+    """
+    load_pdf_library()
+    if low_memory:
+        return PdfReader(open(input_pdf_path, 'rb'))
+    return PdfReader(input_pdf_path)
+
+def release_parsed_objects(reader):
+    """Oublie les objets déjà analysés par le lecteur (relus au besoin)"""
+    reader.resolved_objects.clear()
+
+# Planification du découpage
+
+# Surcoût fixe d'un fichier PDF (en-tête, catalogue, arbre des pages, xref, trailer)
+PDF_BASE_OVERHEAD = 1024
+# Surcoût par objet indirect ("N 0 obj", "endobj" et entrée de la table xref)
+OBJECT_OVERHEAD = 48
+# Clés de page que PdfWriter.add_page ne recopie pas
+PAGE_EXCLUDED_KEYS = ("/Parent", "/StructParents")
+
+def serialize_object(obj):
+    """Retourne la sérialisation d'un objet PDF"""
+    metrics.count("object_serializations")
+    buffer = io.BytesIO()
+    obj.write_to_stream(buffer, None)
+    return buffer.getvalue()
+
+def serialized_size(obj):
+    """Retourne la taille sérialisée d'un objet indirect en octets"""
+    return len(serialize_object(obj)) + OBJECT_OVERHEAD
+
+def measure_object(key, obj, object_sizes, optimize=False):
+    """
+    Mesure un objet indirect et retourne la clé sous laquelle il est compté.
+    Avec optimize, l'objet est mesuré tel que l'étape d'optimisation l'écrira
+    (flux compressé) et les objets identiques partagent la même clé, comme
+    après leur fusion dans le fichier écrit.
+    """
+    if optimize:
+        obj = compress_stream(obj) or obj
+        data = serialize_object(obj)
+        key = ("sha256", hashlib.sha256(data).hexdigest())
+        object_sizes[key] = len(data) + OBJECT_OVERHEAD
+    else:
+        object_sizes[key] = serialized_size(obj)
+    return key
+
+def page_objects(page, object_sizes, canonical_keys=None, optimize=False):
+    """
+    Liste les objets indirects recopiés avec une page (la page elle-même,
+    ses flux de contenu et les ressources qu'elle référence).
+    Chaque objet n'est sérialisé qu'une fois : sa taille est conservée dans
+    object_sizes et sa clé de comptage dans canonical_keys, partagés entre
+    toutes les pages du document.
+    """
+    if canonical_keys is None:
+        canonical_keys = {}
+    page_ref = page.indirect_reference
+    page_key = (page_ref.idnum, page_ref.generation)
+    keys = [page_key]
+    seen = {page_key}
+    if page_key not in object_sizes:
+        object_sizes[page_key] = serialized_size(page)
+    
+    stack = [value for key, value in dict.items(page) if key not in PAGE_EXCLUDED_KEYS]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, IndirectObject):
+            key = (value.idnum, value.generation)
+            if key in seen:
+                continue
+            seen.add(key)
+            value = value.get_object()
+            if value is None:
+                continue
+            # Les liens vers d'autres pages (destinations, arbre des pages)
+            # ne sont pas recopiés avec cette page
+            if isinstance(value, DictionaryObject) and \
+               dict.get(value, "/Type") in ("/Page", "/Pages"):
+                continue
+            if key not in canonical_keys:
+                canonical_keys[key] = measure_object(key, value, object_sizes, optimize)
+            if canonical_keys[key] not in keys:
+                keys.append(canonical_keys[key])
+        
+        if isinstance(value, DictionaryObject):
+            stack.extend(dict.values(value))
+        elif isinstance(value, ArrayObject):
+            stack.extend(value)
+    
+    return keys
+
+def profile_pages(reader, low_memory=False, max_rss_mb=None, optimize=False):
+    """
+    Mesure en une seule passe la contribution sérialisée de chaque page.
+    Retourne (object_sizes, page_keys) : la taille en octets de chaque objet
+    indirect et, pour chaque page, la liste des objets qu'elle utilise.
+    """
+    object_sizes = {}
+    canonical_keys = {}
+    page_keys = []
+    for page_num, page in enumerate(reader.pages, 1):
+        page_keys.append(page_objects(page, object_sizes, canonical_keys, optimize))
+        if page_num % LOW_MEMORY_RELEASE_INTERVAL == 0:
+            if low_memory:
+                release_parsed_objects(reader)
+            check_memory(max_rss_mb)
+    return object_sizes, page_keys
+
+class PartSizeModel:
+    """
+    Estimation de la taille d'une partie en cours de construction.
+    Les objets partagés entre pages (polices, images, XObjects) ne sont
+    comptés qu'une fois par partie, comme dans le fichier réellement écrit.
+    """
+    
+    def __init__(self, object_sizes, page_keys):
+        self.object_sizes = object_sizes
+        self.page_keys = page_keys
+        # Objets utilisés par plusieurs pages du document
+        usage = {}
+        for keys in page_keys:
+            for key in keys:
+                usage[key] = usage.get(key, 0) + 1
+        self.shared_keys = {key for key, count in usage.items() if count > 1}
+        self.reset()
+    
+    def reset(self):
+        """Commence une nouvelle partie vide"""
+        self.keys = set()
+        self.shared_bytes = 0
+        self.unique_bytes = 0
+    
+    @property
+    def size(self):
+        """Taille estimée de la partie en octets"""
+        return PDF_BASE_OVERHEAD + self.shared_bytes + self.unique_bytes
+    
+    def added_size(self, page_num):
+        """Octets ajoutés à la partie si on y ajoute la page"""
+        return sum(self.object_sizes[key] for key in self.page_keys[page_num]
+                   if key not in self.keys)
+    
+    def add_page(self, page_num):
+        """Ajoute une page à la partie, sans recompter ses objets déjà présents"""
+        for key in self.page_keys[page_num]:
+            if key in self.keys:
+                continue
+            self.keys.add(key)
+            if key in self.shared_keys:
+                self.shared_bytes += self.object_sizes[key]
+            else:
+                self.unique_bytes += self.object_sizes[key]
+    
+    def summary(self, start, stop):
+        """Décrit la partie courante couvrant les pages [start, stop["""
+        return {
+            "start": start,
+            "stop": stop,
+            "bytes": self.size,
+            "shared_bytes": self.shared_bytes,
+            "unique_bytes": self.unique_bytes,
+        }
+
+def plan_parts(model, max_bytes, first_page=0, last_page=None):
+    """
+    Calcule les bornes des parties des pages [first_page, last_page[ (tout le
+    document par défaut) en un seul passage linéaire.
+    Retourne une liste de dictionnaires (start, stop, bytes, shared_bytes,
+    unique_bytes) où stop est exclu. Une page dépassant à elle seule la
+    limite forme une partie à part.
+    """
+    if last_page is None:
+        last_page = len(model.page_keys)
+    parts = []
+    start = first_page
+    model.reset()
+    for page_num in range(first_page, last_page):
+        if model.size + model.added_size(page_num) > max_bytes and page_num > start:
+            parts.append(model.summary(start, page_num))
+            start = page_num
+            model.reset()
+        model.add_page(page_num)
+    if start < last_page:
+        parts.append(model.summary(start, last_page))
+    return parts
+
+def range_sizes(model, start, stop, reverse=False):
+    """Tailles estimées des parties [start, k[ (ou [k, stop[ si reverse) pour chaque k"""
+    sizes = {}
+    model.reset()
+    page_nums = range(stop - 1, start - 1, -1) if reverse else range(start, stop)
+    for page_num in page_nums:
+        model.add_page(page_num)
+        sizes[page_num if reverse else page_num + 1] = model.size
+    return sizes
+
+def split_part_in_two(model, part):
+    """Coupe une partie en deux moitiés de tailles aussi proches que possible"""
+    start, stop = part["start"], part["stop"]
+    left_sizes = range_sizes(model, start, stop)
+    right_sizes = range_sizes(model, start, stop, reverse=True)
+    cut = min(range(start + 1, stop), key=lambda k: max(left_sizes[k], right_sizes[k]))
+    halves = []
+    for half_start, half_stop in ((start, cut), (cut, stop)):
+        model.reset()
+        for page_num in range(half_start, half_stop):
+            model.add_page(page_num)
+        halves.append(model.summary(half_start, half_stop))
+    return halves
+
+def plan_balanced_parts(model, parts_count):
+    """
+    Découpe en parts_count parties de tailles aussi proches que possible.
+    La plus petite taille maximale permettant au découpage glouton de
+    produire au plus parts_count parties est trouvée par dichotomie ; si le
+    découpage obtenu compte moins de parties, les plus grosses sont coupées
+    en deux jusqu'à atteindre le nombre demandé. Un document sans page ne
+    donne aucune partie.
+    """
+    if parts_count < 1:
+        raise ValueError("Le nombre de parties doit être un entier positif")
+    page_count = len(model.page_keys)
+    if page_count == 0:
+        return []
+    parts_count = min(parts_count, page_count)
+    
+    # La plus grosse page seule et le document entier bornent la recherche
+    low = max(range_sizes(model, page_num, page_num + 1)[page_num + 1]
+              for page_num in range(page_count))
+    high = plan_parts(model, float("inf"))[0]["bytes"]
+    while low < high:
+        middle = (low + high) // 2
+        if len(plan_parts(model, middle)) <= parts_count:
+            high = middle
+        else:
+            low = middle + 1
+    parts = plan_parts(model, low)
+    
+    while len(parts) < parts_count:
+        index = max((i for i, part in enumerate(parts) if part["stop"] - part["start"] > 1),
+                    key=lambda i: parts[i]["bytes"])
+        parts[index:index + 1] = split_part_in_two(model, parts[index])
+    return parts
+
+def outline_chapters(reader):
+    """
+    Lit une fois les signets de premier niveau et retourne les chapitres
+    sous forme de liste triée de (première page, titre). Les pages placées
+    avant le premier signet forment un chapitre sans titre.
+    """
+    chapters = {}
+    for item in reader.outline:
+        if isinstance(item, list):
+            continue  # Signets de niveau inférieur
+        try:
+            page_num = reader.get_destination_page_number(item)
+        except Exception:
+            continue
+        if page_num is not None and page_num >= 0:
+            chapters.setdefault(page_num, str(item.title))
+    chapters.setdefault(0, None)
+    return sorted(chapters.items())
+
+def plan_outline_parts(model, chapters, max_bytes):
+    """
+    Coupe aux limites des chapitres (voir outline_chapters) ; seuls les
+    chapitres plus gros que max_bytes sont redécoupés par taille.
+    """
+    parts = []
+    bounds = [start for start, title in chapters] + [len(model.page_keys)]
+    for (start, title), stop in zip(chapters, bounds[1:]):
+        for part in plan_parts(model, max_bytes, start, stop):
+            part["chapter"] = title
+            parts.append(part)
+    return parts
+
+# Profils de pages en cache
+
+PROFILE_CACHE_VERSION = 1
+# Taille maximale du cache des profils (Mo) avant suppression des profils les
+# moins récemment utilisés, vérifiée tous les PROFILE_EVICT_INTERVAL enregistrements
+PROFILE_CACHE_SIZE_MB = 100
+PROFILE_EVICT_INTERVAL = 100
+_profile_saves = 0
+
+def file_sha256(file_path):
+    """Retourne l'empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def profile_cache_dir():
+    """Retourne le dossier du cache des profils de pages"""
+    if os.environ.get("PDF_SPLITTER_CACHE"):
+        return os.environ["PDF_SPLITTER_CACHE"]
+    if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+        return os.path.join(os.environ["LOCALAPPDATA"], "pdf_splitter")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pdf_splitter")
+
+def profile_cache_path(sha256, optimize=False):
+    """Chemin du profil en cache d'un fichier, identifié par son empreinte"""
+    suffix = "-optimize" if optimize else ""
+    return os.path.join(profile_cache_dir(), f"{sha256}{suffix}.json")
+
+def load_profile(cache_path):
+    """
+    Charge un profil (object_sizes, page_keys) depuis le cache, ou None.
+    Les objets y sont numérotés : les clés chargées sont des entiers.
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != PROFILE_CACHE_VERSION:
+        return None
+    try:
+        os.utime(cache_path)  # marque le profil comme récemment utilisé
+    except OSError:
+        pass
+    object_sizes = dict(enumerate(data["object_sizes"]))
+    return object_sizes, data["page_keys"]
+
+def save_profile(cache_path, object_sizes, page_keys):
+    """Enregistre un profil dans le cache (ignoré si le cache n'est pas accessible)"""
+    index = {key: number for number, key in enumerate(object_sizes)}
+    data = {
+        "version": PROFILE_CACHE_VERSION,
+        "object_sizes": list(object_sizes.values()),
+        "page_keys": [[index[key] for key in keys] for keys in page_keys],
+    }
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = cache_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        return
+    global _profile_saves
+    if _profile_saves % PROFILE_EVICT_INTERVAL == 0:
+        evict_profiles(os.path.dirname(cache_path))
+    _profile_saves += 1
+
+def evict_profiles(cache_dir, max_size_mb=PROFILE_CACHE_SIZE_MB):
+    """
+    Supprime les profils les moins récemment utilisés (date de modification,
+    mise à jour à chaque lecture) au-delà de max_size_mb
+    """
+    profiles = []
+    try:
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    profiles.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError:
+        return
+    excess = sum(size for _, size, _ in profiles) - max_size_mb * 1024 * 1024
+    for _, size, path in sorted(profiles):
+        if excess <= 0:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        excess -= size
+
+def load_or_profile(input_pdf_path, reader=None, low_memory=False, max_rss_mb=None,
+                    optimize=False, use_cache=True):
+    """
+    Retourne (object_sizes, page_keys, depuis_le_cache). Le profil est relu
+    depuis le cache s'il existe pour ce contenu, sinon mesuré puis enregistré.
+    Le reader n'est ouvert que si le profil doit être mesuré.
+    """
+    cache_path = None
+    if use_cache:
+        with metrics.phase("hash"):
+            sha256 = file_sha256(input_pdf_path)
+        cache_path = profile_cache_path(sha256, optimize)
+        with metrics.phase("cache"):
+            profile = load_profile(cache_path)
+        if profile is not None:
+            metrics.count("profile_cache_hits")
+            return profile + (True,)
+    
+    if reader is None:
+        load_pdf_library()  # L'import est mesuré à part
+        with metrics.phase("parse"):
+            own_reader = open_reader(input_pdf_path, low_memory)
+        try:
+            with metrics.phase("profile"):
+                object_sizes, page_keys = profile_pages(own_reader, low_memory, max_rss_mb,
+                                                        optimize)
+        finally:
+            own_reader.stream.close()
+    else:
+        with metrics.phase("profile"):
+            object_sizes, page_keys = profile_pages(reader, low_memory, max_rss_mb, optimize)
+    if cache_path is not None:
+        with metrics.phase("cache"):
+            save_profile(cache_path, object_sizes, page_keys)
+    return object_sizes, page_keys, False
+
+def plan_split(input_pdf_path, max_size_mb=20, parts_count=None, by="size", optimize=False,
+               use_cache=True, low_memory=False, max_rss_mb=None):
+    """
+    Calcule le découpage sans écrire de PDF. Retourne un dictionnaire
+    décrivant les parties prévues (pages et tailles estimées en octets).
+    """
+    if not os.path.exists(input_pdf_path):
+        raise FileNotFoundError(f"Le fichier {input_pdf_path} n'existe pas")
+    
+    object_sizes, page_keys, cached = load_or_profile(input_pdf_path, None, low_memory,
+                                                      max_rss_mb, optimize, use_cache)
+    model = PartSizeModel(object_sizes, page_keys)
+    if by == "outline" and parts_count is None:
+        reader = open_reader(input_pdf_path, low_memory)
+        try:
+            with metrics.phase("outline"):
+                chapters = outline_chapters(reader)
+        finally:
+            reader.stream.close()
+    with metrics.phase("plan"):
+        if parts_count is not None:
+            parts = plan_balanced_parts(model, parts_count)
+        elif by == "outline":
+            parts = plan_outline_parts(model, chapters, max_size_mb * 1024 * 1024)
+        else:
+            parts = plan_parts(model, max_size_mb * 1024 * 1024)
+    
+    return {
+        "file": input_pdf_path,
+        "pages": len(page_keys),
+        "max_size_mb": None if parts_count is not None else max_size_mb,
+        "parts_count": parts_count,
+        "by": by,
+        "optimize": optimize,
+        "cached_profile": cached,
+        "parts": [dict(part, first_page=part["start"] + 1, last_page=part["stop"])
+                  for part in parts],
+    }
+
+def print_plan(plan):
+    """Affiche un plan de découpage calculé par plan_split"""
+    print(f"Plan de découpage : {plan['file']}")
+    print(f"Nombre total de pages : {plan['pages']}"
+          + (" (profil en cache)" if plan["cached_profile"] else ""))
+    print("-" * 50)
+    if plan["pages"] == 0:
+        print("Document sans page : aucune partie prévue")
+    for part_num, part in enumerate(plan["parts"], 1):
+        print(f"Partie {part_num:03d} : pages {part['first_page']}-{part['last_page']} | "
+              f"Taille estimée : {part['bytes'] / (1024 * 1024):.2f} MB"
+              + (f" | {part['chapter']}" if part.get("chapter") else ""))
+    print("-" * 50)
+    print(f"{len(plan['parts'])} parties prévues")
+
+# Optimisation de la taille des parties
+
+def compress_stream(obj):
+    """
+    Retourne une copie compressée (FlateDecode) d'un flux qui ne l'est pas,
+    ou None si l'objet n'est pas un tel flux ou si la compression n'apporte rien.
+    """
+    if not isinstance(obj, DecodedStreamObject) or "/Filter" in obj:
+        return None
+    data = zlib.compress(obj._data)
+    if len(data) >= len(obj._data):
+        return None
+    compressed = EncodedStreamObject()
+    for key, value in dict.items(obj):
+        if key != "/Length":
+            dict.__setitem__(compressed, key, value)
+    compressed[NameObject("/Filter")] = NameObject("/FlateDecode")
+    compressed._data = data
+    return compressed
+
+def _replace_references(obj, replacements, writer):
+    """Redirige les références d'un objet vers les objets conservés"""
+    stack = [obj]
+    while stack:
+        container = stack.pop()
+        if isinstance(container, DictionaryObject):
+            items = list(dict.items(container))
+        elif isinstance(container, ArrayObject):
+            items = list(enumerate(container))
+        else:
+            continue
+        for key, value in items:
+            if isinstance(value, IndirectObject):
+                if value.pdf is writer and value.idnum in replacements:
+                    container[key] = IndirectObject(replacements[value.idnum], 0, writer)
+            elif isinstance(value, (DictionaryObject, ArrayObject)):
+                stack.append(value)
+
+def merge_identical_objects(writer):
+    """
+    Fusionne les objets dont la sérialisation est identique : une seule
+    occurrence est conservée, les autres sont remplacées par null et leurs
+    références redirigées. Répété tant que des fusions en permettent d'autres.
+    """
+    protected = {writer._root.idnum, writer._info.idnum, writer._pages.idnum}
+    while True:
+        kept = {}
+        replacements = {}
+        for idnum, obj in enumerate(writer._objects, 1):
+            if idnum in protected or obj is None or isinstance(obj, NullObject):
+                continue
+            if isinstance(obj, DictionaryObject) and dict.get(obj, "/Type") in ("/Page", "/Pages"):
+                continue
+            digest = hashlib.sha256(serialize_object(obj)).digest()
+            if digest in kept:
+                replacements[idnum] = kept[digest]
+            else:
+                kept[digest] = idnum
+        if not replacements:
+            return
+        for idnum in replacements:
+            writer._objects[idnum - 1] = NullObject()
+        for obj in writer._objects:
+            _replace_references(obj, replacements, writer)
+
+def optimize_writer(writer):
+    """
+    Réduit la taille d'une partie avant écriture : compression des flux non
+    compressés (contenus, polices, images brutes) et fusion des objets
+    identiques. Les flux d'objets et tables xref compressées ne sont pas
+    disponibles avec l'écrivain de PyPDF2.
+    """
+    for index, obj in enumerate(writer._objects):
+        compressed = compress_stream(obj)
+        if compressed is not None:
+            writer._objects[index] = compressed
+    merge_identical_objects(writer)
+
+# Recompression des images
+
+def _image_filter(stream):
+    """Retourne le filtre unique d'un flux image (None s'il n'est pas compressé)"""
+    filters = stream.get("/Filter")
+    if isinstance(filters, ArrayObject):
+        if len(filters) != 1:
+            return "?"
+        filters = filters[0]
+    return filters
+
+def recompress_image(stream, page_width_in, page_height_in, image_dpi, jpeg_quality):
+    """
+    Réduit une image à image_dpi (résolution estimée sur la taille de la page)
+    et la recompresse en JPEG. Retourne le nouveau flux, ou None si l'image
+    n'est pas prise en charge ou si le résultat n'est pas plus petit.
+    """
+    if stream.get("/ImageMask") or "/Decode" in stream or stream.get("/BitsPerComponent") != 8:
+        return None
+    mode = {"/DeviceRGB": "RGB", "/DeviceGray": "L"}.get(stream.get("/ColorSpace"))
+    image_filter = _image_filter(stream)
+    if mode is None or image_filter not in (None, "/FlateDecode", "/DCTDecode"):
+        return None
+    
+    width, height = int(stream["/Width"]), int(stream["/Height"])
+    try:
+        if image_filter == "/DCTDecode":
+            image = Image.open(io.BytesIO(stream._data))
+        else:
+            image = Image.frombytes(mode, (width, height), stream.get_data())
+    except Exception:
+        return None
+    
+    dpi = max(width / page_width_in, height / page_height_in)
+    if dpi > image_dpi:
+        scale = image_dpi / dpi
+        image = image.resize((max(1, round(width * scale)), max(1, round(height * scale))),
+                             Image.LANCZOS)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=jpeg_quality, optimize=True)
+    data = buffer.getvalue()
+    if len(data) >= len(stream._data):
+        return None
+    
+    recompressed = EncodedStreamObject()
+    for key, value in dict.items(stream):
+        if key not in ("/Length", "/Filter", "/DecodeParms"):
+            dict.__setitem__(recompressed, key, value)
+    recompressed[NameObject("/Filter")] = NameObject("/DCTDecode")
+    recompressed[NameObject("/Width")] = NumberObject(image.width)
+    recompressed[NameObject("/Height")] = NumberObject(image.height)
+    recompressed[NameObject("/ColorSpace")] = NameObject(
+        "/DeviceRGB" if image.mode == "RGB" else "/DeviceGray")
+    recompressed._data = data
+    return recompressed
+
+def _image_references(resources, seen):
+    """
+    Parcourt les images d'un dictionnaire de ressources (formulaires compris) ;
+    les ressources et leur dictionnaire /XObject peuvent être des références
+    """
+    if resources is None:
+        return
+    xobjects = resources.get_object().get("/XObject")
+    if xobjects is None:
+        return
+    for ref in dict.values(xobjects.get_object()):
+        if not isinstance(ref, IndirectObject) or ref.idnum in seen:
+            continue
+        seen.add(ref.idnum)
+        obj = ref.get_object()
+        if obj.get("/Subtype") == "/Image":
+            yield ref
+        elif obj.get("/Subtype") == "/Form":
+            yield from _image_references(obj.get("/Resources"), seen)
+
+def shared_image_ids(reader, low_memory=False):
+    """Numéros des images utilisées par plusieurs pages du document"""
+    usage = {}
+    for page_num, page in enumerate(reader.pages, 1):
+        for ref in _image_references(page.get("/Resources"), set()):
+            usage[ref.idnum] = usage.get(ref.idnum, 0) + 1
+        if low_memory and page_num % LOW_MEMORY_RELEASE_INTERVAL == 0:
+            release_parsed_objects(reader)
+    return {idnum for idnum, count in usage.items() if count > 1}
+
+def recompress_images(writer, image_dpi, jpeg_quality, skip=()):
+    """
+    Recompresse en place les images des pages d'un PdfWriter, sauf celles dont
+    le numéro d'objet (dans le PdfWriter) figure dans skip
+    """
+    load_pillow()
+    seen = set(skip)
+    for page in writer.pages:
+        page_width_in = float(page.mediabox.width) / 72
+        page_height_in = float(page.mediabox.height) / 72
+        for ref in _image_references(page.get("/Resources"), seen):
+            recompressed = recompress_image(ref.get_object(), page_width_in, page_height_in,
+                                            image_dpi, jpeg_quality)
+            if recompressed is not None:
+                writer._objects[ref.idnum - 1] = recompressed
+
+def build_part_writer(reader, start, stop, optimize=False):
+    """Prépare un PdfWriter contenant les pages [start, stop["""
+    writer = PdfWriter()
+    with metrics.phase("add_page"):
+        for page_num in range(start, stop):
+            writer.add_page(reader.pages[page_num])
+    if optimize:
+        with metrics.phase("optimize"):
+            optimize_writer(writer)
+    return writer
+
+def serialize_writer(writer):
+    """Sérialise un PdfWriter en mémoire et retourne les octets du PDF"""
+    metrics.count("serializations")
+    with metrics.phase("serialize"):
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+def serialize_pages(reader, start, stop, optimize=False):
+    """Sérialise en mémoire les pages [start, stop[ et retourne les octets du PDF"""
+    return serialize_writer(build_part_writer(reader, start, stop, optimize))
+
+def write_writer(writer, output_path):
+    """
+    Écrit un PdfWriter directement dans un fichier, sans copie en mémoire, et
+    retourne sa taille en MB (la sérialisation est comptée dans la phase write)
+    """
+    metrics.count("serializations")
+    with metrics.phase("write"):
+        with open(output_path, 'wb') as output_file:
+            writer.write(output_file)
+            size = output_file.tell()
+    metrics.count("bytes_written", size)
+    return size / (1024 * 1024)
+
+def write_bytes(data, output_path):
+    """Écrit un PDF sérialisé sur le disque et retourne sa taille en MB"""
+    with metrics.phase("write"):
+        with open(output_path, 'wb') as output_file:
+            output_file.write(data)
+    metrics.count("bytes_written", len(data))
+    return len(data) / (1024 * 1024)
+
+def find_part_end(reader, start, max_bytes, optimize=False, stop=None):
+    """
+    Cherche la fin (exclue) de la plus grande partie commençant à start qui
+    tient dans max_bytes, sans dépasser stop (par défaut la fin du document) :
+    le nombre de pages double jusqu'à dépasser la limite, puis la borne est
+    affinée par dichotomie.
+    Retourne (fin, données) où données est la sérialisation de la partie
+    retenue, ou None si elle n'a pas été sérialisée (page seule).
+    """
+    if stop is None:
+        stop = len(reader.pages)
+    # Une page seule est toujours acceptée, même si elle dépasse la limite
+    low, low_data = start + 1, None
+    high = None
+    
+    # Phase de galop
+    count = 1
+    while low < stop:
+        count *= 2
+        candidate = min(start + count, stop)
+        data = serialize_pages(reader, start, candidate, optimize)
+        if len(data) <= max_bytes:
+            low, low_data = candidate, data
+        else:
+            high = candidate
+            break
+    
+    # Recherche dichotomique entre low (accepté) et high (refusé)
+    while high is not None and high - low > 1:
+        middle = (low + high) // 2
+        data = serialize_pages(reader, start, middle, optimize)
+        if len(data) <= max_bytes:
+            low, low_data = middle, data
+        else:
+            high = middle
+    
+    return low, low_data
+
+def gallop_parts(reader, max_bytes, optimize=False, start=0, stop=None):
+    """
+    Découpage par essais successifs en mémoire, sans estimation des tailles,
+    des pages [start, stop[ (par défaut tout le document).
+    Sert de repli quand la planification n'est pas possible (PDF chiffré ou
+    atypique) ou qu'une partie écrite dépasse son estimation :
+    O(log k) sérialisations par partie de k pages.
+    """
+    if stop is None:
+        stop = len(reader.pages)
+    while start < stop:
+        end, data = find_part_end(reader, start, max_bytes, optimize, stop)
+        if data is None:
+            data = serialize_pages(reader, start, end, optimize)
+        yield {"start": start, "stop": end, "bytes": len(data), "data": data}
+        start = end
+
+def write_part(reader, start, stop, output_path, optimize=False, images=None):
+    """
+    Écrit les pages [start, stop[ dans un fichier et retourne sa taille en MB.
+    images : (dpi, qualité JPEG, numéros des images partagées avec d'autres
+    pages) pour recompresser les images propres aux pages de la partie.
+    """
+    writer = build_part_writer(reader, start, stop, optimize)
+    if images is not None:
+        image_dpi, jpeg_quality, shared = images
+        # Numéros des images partagées une fois copiées dans le PdfWriter
+        translated = writer._id_translated.get(id(reader), {})
+        skip = {translated[idnum] for idnum in shared if idnum in translated}
+        with metrics.phase("images"):
+            recompress_images(writer, image_dpi, jpeg_quality, skip)
+    return write_writer(writer, output_path)
+
+def _write_parts_worker(input_pdf_path, tasks, low_memory=False, max_rss_mb=None,
+                        optimize=False):
+    """Écrit un groupe de parties (start, stop, chemin, images) depuis un processus séparé"""
+    reader = open_reader(input_pdf_path, low_memory)
+    sizes = []
+    try:
+        for start, stop, output_path, images in tasks:
+            sizes.append(write_part(reader, start, stop, output_path, optimize, images))
+            if low_memory:
+                release_parsed_objects(reader)
+            check_memory(max_rss_mb)
+    finally:
+        reader.stream.close()
+    return sizes
+
+def write_parts_parallel(input_pdf_path, tasks, jobs, low_memory=False, max_rss_mb=None,
+                         optimize=False):
+    """
+    Répartit l'écriture des parties (start, stop, chemin, images) entre plusieurs
+    processus ; chacun ouvre le fichier source une seule fois.
+    Retourne la taille en MB de chaque partie, dans l'ordre des tâches.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    jobs = min(jobs, len(tasks))
+    groups = [tasks[i::jobs] for i in range(jobs)]
+    sizes = [None] * len(tasks)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_write_parts_worker, input_pdf_path, group,
+                                   low_memory, max_rss_mb, optimize)
+                   for group in groups]
+        for group_num, future in enumerate(futures):
+            sizes[group_num::jobs] = future.result()
+    return sizes
+
+def _recompress_part_worker(input_pdf_path, start, stop, output_path, optimize, images):
+    """Écrit une partie trop grosse en recompressant ses images, depuis un processus séparé"""
+    reader = open_reader(input_pdf_path, low_memory=True)
+    try:
+        return write_part(reader, start, stop, output_path, optimize, images)
+    finally:
+        reader.stream.close()
+
+def split_pdf_by_size(input_pdf_path, max_size_mb=20, output_dir=None, log=print,
+                      search="plan", jobs=1, low_memory=False, max_rss_mb=None,
+                      optimize=False, image_dpi=None, jpeg_quality=75, parts_count=None,
+                      use_cache=True, progress=None, metrics_path=None,
+                      metrics_format="json", by="size", unit="MB"):
+    """
+    Découpe un PDF en plusieurs fichiers de taille maximale définie.
+    
+    search="plan" : les tailles des pages sont mesurées une seule fois, les
+    bornes des parties sont calculées en un passage, puis chaque partie est
+    écrite une seule fois.
+    search="galloping" : les bornes sont trouvées par essais en mémoire
+    (galop puis dichotomie), utilisé aussi en repli si la planification échoue.
+    
+    Avec jobs > 1, les parties planifiées sont écrites en parallèle par un
+    pool de processus.
+    
+    low_memory : le source est lu à la demande et les objets analysés sont
+    oubliés après chaque partie, seule la partie en cours reste en mémoire.
+    max_rss_mb : interrompt le découpage (MemoryError) au-delà de cette RSS.
+    optimize : les parties sont compressées et dédoublonnées avant écriture,
+    la planification et les essais en tiennent compte.
+    image_dpi : les images des parties qui dépassent encore la limite (pages
+    trop grosses à elles seules) sont réduites à cette résolution et
+    recompressées en JPEG (jpeg_quality), une page par processus.
+    parts_count : découpe plutôt en ce nombre de parties de tailles proches
+    (max_size_mb est alors ignoré ; nécessite la planification).
+    use_cache : réutilise le profil des pages mis en cache pour ce contenu.
+    progress : appelé après chaque partie écrite avec (pages écrites,
+    nombre total de pages, octets écrits).
+    by : "outline" coupe aux signets de premier niveau (chapitres) et ne
+    redécoupe par taille que les chapitres trop gros.
+    metrics_path : chronomètre chaque phase (lecture, profil, ajout des pages,
+    sérialisation, écriture...) et enregistre les mesures dans ce fichier,
+    au format metrics_format ("json" ou "prometheus").
+    unit : unité affichée pour les tailles ("Mo" dans l'interface graphique).
+    """
     
     if not os.path.exists(input_pdf_path):
         raise FileNotFoundError(f"Le fichier {input_pdf_path} n'existe pas")
     
+    if image_dpi is not None and not load_pillow():
+        raise ImportError("La recompression des images nécessite Pillow : pip install Pillow")
+    
     if output_dir is None:
         output_dir = os.path.dirname(input_pdf_path)
     else:
@@ -351,90 +1437,526 @@ def split_pdf_by_size(input_pdf_path, max_size_mb=20, output_dir=None):
     
     base_name = os.path.splitext(os.path.basename(input_pdf_path))[0]
     
-    print(f"Lecture du PDF : {input_pdf_path}")
-    print(f"Taille originale : {get_file_size_mb(input_pdf_path):.2f} MB")
-    print(f"Taille maximale par fichier : {max_size_mb} MB")
-    print("-" * 50)
+    log(f"Lecture du PDF : {input_pdf_path}")
+    log(f"Taille originale : {get_file_size_mb(input_pdf_path):.2f} {unit}")
+    if parts_count is not None:
+        log(f"Nombre de parties : {parts_count}")
+        max_size_mb = None
+    else:
+        log(f"Taille maximale par fichier : {max_size_mb} {unit}")
+    log("-" * 50)
     
-    reader = PdfReader(input_pdf_path)
-    total_pages = len(reader.pages)
+    if metrics_path is not None:
+        metrics.start()
+    run_start = time.perf_counter()
     
-    print(f"Nombre total de pages : {total_pages}")
+    load_pdf_library()  # L'import est mesuré à part, hors de la phase parse
+    with metrics.phase("parse"):
+        reader = open_reader(input_pdf_path, low_memory)
+    try:
+        created_files = _split_reader(reader, input_pdf_path, base_name, max_size_mb,
+                                      output_dir, log, search, jobs, low_memory, max_rss_mb,
+                                      optimize, image_dpi, jpeg_quality, parts_count, use_cache,
+                                      progress, by, unit)
+    finally:
+        if low_memory:
+            reader.stream.close()
+    
+    log("-" * 50)
+    log(f"Terminé ! {len(created_files)} fichiers créés")
+    peak = peak_rss_mb()
+    if peak is not None:
+        children_peak = peak_rss_mb(children=True)
+        if jobs > 1 and children_peak:
+            log(f"Mémoire maximale (RSS) : {peak:.0f} {unit}, "
+                f"processus d'écriture : {children_peak:.0f} {unit}")
+        else:
+            log(f"Mémoire maximale (RSS) : {peak:.0f} {unit}")
+    
+    if metrics_path is not None:
+        finish_metrics(metrics_path, metrics_format, os.path.basename(input_pdf_path),
+                       run_start, log)
+    
+    return created_files
+
+def _log_part(log, output_filename, part, final_size, max_size_mb, recompressed=False,
+              unit="MB"):
+    """Affiche le résumé d'une partie écrite"""
+    log(f"Créé : {output_filename}" + (" (images recompressées)" if recompressed else "")
+        + (f" | {part['chapter']}" if part.get("chapter") else ""))
+    details = ""
+    # L'estimation ne vaut que pour les parties écrites telles que planifiées
+    if "shared_bytes" in part and not recompressed:
+        details = (f" (partagés : {part['shared_bytes'] / 1024:.0f} Ko, "
+                   f"propres : {part['unique_bytes'] / 1024:.0f} Ko)")
+    log(f"   Pages : {part['start'] + 1}-{part['stop']} | Taille : {final_size:.2f} {unit}{details}")
+    if max_size_mb is not None and final_size > max_size_mb:
+        log(f"   Attention : la partie dépasse la limite de {max_size_mb} {unit}")
+
+def _split_reader(reader, input_pdf_path, base_name, max_size_mb, output_dir, log,
+                  search, jobs, low_memory, max_rss_mb, optimize, image_dpi, jpeg_quality,
+                  parts_count, use_cache, progress, by="size", unit="MB"):
+    """Planifie puis écrit les parties ; retourne la liste des fichiers créés"""
+    from concurrent.futures import Future, ProcessPoolExecutor
+    with metrics.phase("parse"):
+        total_pages = len(reader.pages)
+    
+    log(f"Nombre total de pages : {total_pages}")
+    if total_pages == 0:
+        log("Document sans page : aucune partie créée")
+        return []
+    
+    if parts_count is not None:
+        # Pas de taille maximale : aucune partie n'est considérée trop grosse
+        max_bytes = float("inf")
+        object_sizes, page_keys, _ = load_or_profile(input_pdf_path, reader, low_memory,
+                                                     max_rss_mb, optimize, use_cache)
+        with metrics.phase("plan"):
+            parts = plan_balanced_parts(PartSizeModel(object_sizes, page_keys), parts_count)
+        search = "plan"
+    elif by == "outline":
+        max_bytes = max_size_mb * 1024 * 1024
+        with metrics.phase("outline"):
+            chapters = outline_chapters(reader)
+        if len(chapters) > 1 or chapters[0][1] is not None:
+            log(f"Chapitres (signets de premier niveau) : {len(chapters)}")
+        else:
+            log("Aucun signet : découpage par taille")
+        object_sizes, page_keys, _ = load_or_profile(input_pdf_path, reader, low_memory,
+                                                     max_rss_mb, optimize, use_cache)
+        with metrics.phase("plan"):
+            parts = plan_outline_parts(PartSizeModel(object_sizes, page_keys), chapters,
+                                       max_bytes)
+        search = "plan"
+    elif search == "plan":
+        max_bytes = max_size_mb * 1024 * 1024
+        try:
+            object_sizes, page_keys, _ = load_or_profile(input_pdf_path, reader, low_memory,
+                                                         max_rss_mb, optimize, use_cache)
+            with metrics.phase("plan"):
+                parts = plan_parts(PartSizeModel(object_sizes, page_keys), max_bytes)
+        except MemoryError:
+            raise
+        except Exception as e:
+            log(f"Planification impossible ({e}), recherche par galop")
+            search = "galloping"
+    if search == "galloping":
+        max_bytes = max_size_mb * 1024 * 1024
+        parts = gallop_parts(reader, max_bytes, optimize)
+    
+    images = None
+    if image_dpi is not None and (search != "plan"
+                                  or any(part["bytes"] > max_bytes for part in parts)):
+        # Les images partagées avec d'autres pages (logos, fonds) sont conservées
+        with metrics.phase("images"):
+            shared = shared_image_ids(reader, low_memory)
+        images = (image_dpi, jpeg_quality, shared)
+    
+    parallel_sizes = None
+    if search == "plan" and jobs > 1 and len(parts) > 1:
+        tasks = [(part["start"], part["stop"],
+                  os.path.join(output_dir, f"{base_name}_partie_{part_num:03d}.pdf"),
+                  images if part["bytes"] > max_bytes else None)
+                 for part_num, part in enumerate(parts, 1)]
+        log(f"Écriture de {len(tasks)} parties avec {min(jobs, len(tasks))} processus")
+        with metrics.phase("parallel_write"):
+            parallel_sizes = write_parts_parallel(input_pdf_path, tasks, jobs,
+                                                  low_memory, max_rss_mb, optimize)
+        metrics.count("bytes_written", int(sum(parallel_sizes) * 1024 * 1024))
+    
+    # Les parties trop grosses malgré le découpage sont recompressées par un
+    # pool de processus (jobs - 1, le processus principal écrivant les autres
+    # parties) ; avec un seul processus, elles sont recompressées sur place
+    image_executor = None
+    if images is not None and parallel_sizes is None and jobs > 1:
+        image_executor = ProcessPoolExecutor(max_workers=jobs - 1)
+    # Parties écrites ou en cours de recompression, affichées dans l'ordre des pages
+    pending = collections.deque()
     
-    current_writer = PdfWriter()
-    current_part = 1
-    current_pages = []
     created_files = []
+    over_limit = []
+    pages_done = 0
+    bytes_written = 0
     
-    for page_num in range(total_pages):
-        page = reader.pages[page_num]
-        current_writer.add_page(page)
-        current_pages.append(page_num + 1)
-        
-        temp_filename = os.path.join(output_dir, f"temp_check.pdf")
-        with open(temp_filename, 'wb') as temp_file:
-            current_writer.write(temp_file)
-        
-        current_size_mb = get_file_size_mb(temp_filename)
-        
-        if (current_size_mb > max_size_mb and len(current_pages) > 1) or \
-           (page_num == total_pages - 1 and len(current_pages) > 0):
-            
-            if current_size_mb > max_size_mb and len(current_pages) > 1:
-                current_writer = PdfWriter()
-                for p in current_pages[:-1]:
-                    current_writer.add_page(reader.pages[p-1])
-                pages_range = f"{current_pages[0]}-{current_pages[-2]}"
-                next_start = current_pages[-1]
+    def report(wait):
+        """Affiche les parties terminées en tête de file (toutes si wait)"""
+        nonlocal pages_done, bytes_written
+        while pending and (wait or not isinstance(pending[0][2], Future)
+                           or pending[0][2].done()):
+            output_filename, part, result, recompressed = pending.popleft()
+            if isinstance(result, Future):
+                with metrics.phase("images"):
+                    final_size = result.result()
+                metrics.count("bytes_written", int(final_size * 1024 * 1024))
             else:
-                pages_range = f"{current_pages[0]}-{current_pages[-1]}"
-                next_start = None
-            
-            output_filename = f"{base_name}_partie_{current_part:03d}.pdf"
+                final_size = result
+            _log_part(log, output_filename, part, final_size, max_size_mb, recompressed, unit)
+            if recompressed and final_size > max_size_mb:
+                over_limit.append(output_filename)
+            pages_done += part["stop"] - part["start"]
+            bytes_written += final_size * 1024 * 1024
+            metrics.count("parts_written")
+            if progress is not None:
+                progress(pages_done, total_pages, bytes_written)
+    
+    try:
+        parts = iter(parts)
+        part_num = 0
+        while True:
+            part = next(parts, None)
+            if part is None:
+                break
+            part_num += 1
+            output_filename = f"{base_name}_partie_{part_num:03d}.pdf"
             output_path = os.path.join(output_dir, output_filename)
             
-            with open(output_path, 'wb') as output_file:
-                current_writer.write(output_file)
-            
-            final_size = get_file_size_mb(output_path)
-            created_files.append(output_path)
-            
-            print(f"Créé : {output_filename}")
-            print(f"   Pages : {pages_range} | Taille : {final_size:.2f} MB")
+            recompressed = images is not None and part["bytes"] > max_bytes
+            if recompressed and image_executor is not None:
+                part.pop("data", None)
+                result = image_executor.submit(_recompress_part_worker, input_pdf_path,
+                                               part["start"], part["stop"], output_path,
+                                               optimize, images)
+            elif recompressed and parallel_sizes is None:
+                part.pop("data", None)
+                result = write_part(reader, part["start"], part["stop"], output_path,
+                                    optimize, images)
+            else:
+                result = _write_planned_part(reader, part, part_num, output_path,
+                                             parallel_sizes, optimize)
+            if low_memory:
+                release_parsed_objects(reader)
+            check_memory(max_rss_mb)
             
-            current_writer = PdfWriter()
-            current_part += 1
-            current_pages = []
+            # L'estimation peut être dépassée : la plage est alors redécoupée
+            # par galop sur les tailles réelles, les parties suivantes décalées
+            if (not recompressed and max_size_mb is not None and result > max_size_mb
+                    and part["stop"] - part["start"] > 1):
+                log(f"{output_filename} : {result:.2f} {unit} au lieu des "
+                    f"{part['bytes'] / (1024 * 1024):.2f} {unit} prévus, redécoupage "
+                    f"des pages {part['start'] + 1}-{part['stop']}")
+                os.remove(output_path)
+                metrics.count("resplit_parts")
+                part_num -= 1
+                # Les parties écrites en parallèle ne correspondent plus aux numéros
+                parallel_sizes = None
+                sub_parts = gallop_parts(reader, max_bytes, optimize, part["start"], part["stop"])
+                parts = itertools.chain(sub_parts, parts)
+                continue
             
-            if next_start and page_num < total_pages - 1:
-                current_writer.add_page(reader.pages[page_num])
-                current_pages.append(page_num + 1)
-        
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
+            created_files.append(output_path)
+            pending.append((output_filename, part, result, recompressed))
+            report(wait=False)
+        report(wait=True)
+    finally:
+        if image_executor is not None:
+            image_executor.shutdown()
     
-    if len(current_pages) > 0:
-        output_filename = f"{base_name}_partie_{current_part:03d}.pdf"
-        output_path = os.path.join(output_dir, output_filename)
+    if over_limit:
+        raise ValueError(f"{len(over_limit)} partie(s) dépassent encore {max_size_mb} {unit} "
+                         f"après recompression des images : {', '.join(over_limit)} "
+                         f"(réduire --images-dpi ou --jpeg-quality)")
+    return created_files
+
+def _write_planned_part(reader, part, part_num, output_path, parallel_sizes, optimize):
+    """Écrit une partie (ou reprend sa taille si elle a été écrite en parallèle)"""
+    if parallel_sizes is not None:
+        return parallel_sizes[part_num - 1]
+    if "data" in part:
+        return write_bytes(part["data"], output_path)
+    return write_part(reader, part["start"], part["stop"], output_path, optimize)
+
+# Découpage en flux (sans fichier temporaire)
+
+def open_source(source, stack):
+    """
+    Retourne un flux binaire positionnable pour PdfReader à partir d'un chemin
+    (projeté en mémoire), d'octets ou d'un flux binaire (lu entièrement s'il
+    n'est pas positionnable, comme l'entrée standard). Les ressources ouvertes
+    sont fermées avec stack.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if isinstance(source, (str, os.PathLike)):
+        source_file = stack.enter_context(open(source, 'rb'))
+        if os.fstat(source_file.fileno()).st_size == 0:
+            return source_file
+        return stack.enter_context(mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ))
+    if hasattr(source, "seekable") and source.seekable():
+        return source
+    return io.BytesIO(source.read())
+
+def iter_split_parts(source, max_size_mb=20, parts_count=None, optimize=False,
+                     low_memory=False, by="size"):
+    """
+    Découpe un PDF sans écrire sur le disque et produit pour chaque partie
+    (numéro de la partie, (début, fin), octets du PDF), les pages de la partie
+    étant range(début, fin).
+    
+    source : chemin, octets ou flux binaire (voir open_source).
+    Les autres paramètres sont ceux de split_pdf_by_size.
+    """
+    load_pdf_library()
+    with contextlib.ExitStack() as stack:
+        with metrics.phase("parse"):
+            reader = PdfReader(open_source(source, stack))
+            total_pages = len(reader.pages)
+        if total_pages == 0:
+            return
         
-        with open(output_path, 'wb') as output_file:
-            current_writer.write(output_file)
+        try:
+            with metrics.phase("profile"):
+                object_sizes, page_keys = profile_pages(reader, low_memory, optimize=optimize)
+            model = PartSizeModel(object_sizes, page_keys)
+            with metrics.phase("plan"):
+                if parts_count is not None:
+                    parts = plan_balanced_parts(model, parts_count)
+                elif by == "outline":
+                    parts = plan_outline_parts(model, outline_chapters(reader),
+                                               max_size_mb * 1024 * 1024)
+                else:
+                    parts = plan_parts(model, max_size_mb * 1024 * 1024)
+        except Exception:
+            if parts_count is not None or by == "outline":
+                raise
+            parts = gallop_parts(reader, max_size_mb * 1024 * 1024, optimize)
         
-        final_size = get_file_size_mb(output_path)
-        created_files.append(output_path)
+        for part_num, part in enumerate(parts, 1):
+            data = part.pop("data", None)
+            if data is None:
+                data = serialize_pages(reader, part["start"], part["stop"], optimize)
+            if low_memory:
+                release_parsed_objects(reader)
+            metrics.count("parts_written")
+            yield part_num, (part["start"], part["stop"]), data
+
+def write_parts_archive(parts, output_stream, archive_format="tar", base_name="document",
+                        log=print):
+    """
+    Écrit les parties produites par iter_split_parts dans une archive tar ou zip
+    au fil de l'eau ; output_stream peut être non positionnable (sortie standard).
+    Retourne le nombre de parties écrites.
+    """
+    import tarfile
+    import zipfile
+    
+    count = 0
+    if archive_format == "zip":
+        # Les PDF sont déjà compressés : les parties sont stockées telles quelles
+        archive = zipfile.ZipFile(output_stream, 'w', compression=zipfile.ZIP_STORED)
+    else:
+        archive = tarfile.open(fileobj=output_stream, mode='w|')
+    with archive:
+        for part_num, (start, stop), data in parts:
+            name = f"{base_name}_partie_{part_num:03d}.pdf"
+            with metrics.phase("write"):
+                if archive_format == "zip":
+                    archive.writestr(name, data)
+                else:
+                    info = tarfile.TarInfo(name)
+                    info.size = len(data)
+                    info.mtime = int(time.time())
+                    archive.addfile(info, io.BytesIO(data))
+            metrics.count("bytes_written", len(data))
+            log(f"{name} : pages {start + 1}-{stop} | {len(data) / (1024 * 1024):.2f} MB")
+            count += 1
+    return count
+
+# Découpage par lots
+
+# Fichiers produits par le découpeur, à ne pas redécouper
+PART_FILE_PATTERN = re.compile(r"_partie_\d{3}\.pdf$", re.IGNORECASE)
+MANIFEST_NAME = "pdf_splitter_manifest.jsonl"
+
+def load_manifest(manifest_path):
+    """
+    Charge le manifeste des fichiers déjà traités : une ligne JSON par fichier
+    terminé, la dernière ligne d'un fichier remplaçant les précédentes.
+    Retourne ({fichier: entrée}, nombre de lignes). Une ligne illisible
+    (écriture interrompue) est ignorée.
+    """
+    manifest = {}
+    lines = 0
+    if not os.path.exists(manifest_path):
+        return manifest, lines
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                manifest[entry["file"]] = entry
+            except (ValueError, TypeError, KeyError):
+                continue
+            lines += 1
+    return manifest, lines
+
+def append_manifest(entry, manifest_file):
+    """Ajoute l'entrée d'un fichier terminé à la fin du manifeste"""
+    manifest_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    manifest_file.flush()
+
+def save_manifest(manifest, manifest_path):
+    """Réécrit le manifeste de façon atomique, une ligne par fichier"""
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for entry in manifest.values():
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    os.replace(temp_path, manifest_path)
+
+def find_pdf_files(input_dir):
+    """Parcourt l'arborescence et retourne les PDF à découper"""
+    pdf_files = []
+    for dirpath, dirnames, filenames in os.walk(input_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(".pdf") and not PART_FILE_PATTERN.search(filename):
+                pdf_files.append(os.path.join(dirpath, filename))
+    return pdf_files
+
+def split_parameters(max_size_mb, search, optimize, image_dpi, jpeg_quality,
+                     parts_count=None, by="size"):
+    """Paramètres qui déterminent les parties produites, enregistrés dans le manifeste"""
+    return {
+        "size_mb": max_size_mb if parts_count is None else None,
+        "parts": parts_count,
+        "by": by,
+        "search": "plan" if parts_count is not None or by == "outline" else search,
+        "optimize": optimize,
+        "images_dpi": image_dpi,
+        "jpeg_quality": jpeg_quality if image_dpi is not None else None,
+    }
+
+def is_done(entry, input_path, parameters, manifest_dir):
+    """
+    Indique si un fichier figure déjà dans le manifeste, inchangé, découpé avec
+    les mêmes paramètres, et si toutes ses parties existent encore
+    """
+    if entry is None or entry.get("parameters") != parameters:
+        return False
+    if not all(os.path.exists(os.path.join(manifest_dir, part["file"]))
+               for part in entry["parts"]):
+        return False
+    stat = os.stat(input_path)
+    if entry["bytes"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+        return True
+    return entry["sha256"] == file_sha256(input_path)
+
+def _quiet(message):
+    """Journal muet pour les processus du mode lot"""
+
+def _split_file_worker(input_path, max_size_mb, output_dir, search, low_memory, max_rss_mb,
+                       optimize, image_dpi, jpeg_quality, use_cache=True, parts_count=None,
+                       by="size"):
+    """Découpe un fichier du lot depuis un processus séparé"""
+    stat = os.stat(input_path)
+    sha256 = file_sha256(input_path)
+    created_files = split_pdf_by_size(input_path, max_size_mb, output_dir,
+                                      log=_quiet, search=search, low_memory=low_memory,
+                                      max_rss_mb=max_rss_mb, optimize=optimize,
+                                      image_dpi=image_dpi, jpeg_quality=jpeg_quality,
+                                      use_cache=use_cache, parts_count=parts_count, by=by)
+    return {
+        "sha256": sha256,
+        "bytes": stat.st_size,
+        "mtime": stat.st_mtime,
+        "parts": [{"file": path, "size_mb": round(get_file_size_mb(path), 3)}
+                  for path in created_files],
+    }
+
+def split_directory(input_dir, max_size_mb=20, output_dir=None, jobs=1, search="plan",
+                    manifest_path=None, log=print, low_memory=False, max_rss_mb=None,
+                    optimize=False, image_dpi=None, jpeg_quality=75, use_cache=True,
+                    parts_count=None, by="size"):
+    """
+    Découpe tous les PDF d'une arborescence avec un pool de processus, les plus
+    gros fichiers en premier. Chaque fichier terminé est ajouté au manifeste
+    (empreinte, paramètres, parties, tailles) : une relance ignore les
+    fichiers inchangés déjà découpés avec les mêmes paramètres et dont toutes
+    les parties existent encore.
+    Les sous-dossiers sont reproduits dans output_dir s'il est fourni.
+    Retourne la liste des fichiers en erreur.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    if not os.path.isdir(input_dir):
+        raise FileNotFoundError(f"Le dossier {input_dir} n'existe pas")
+    
+    if manifest_path is None:
+        manifest_path = os.path.join(output_dir or input_dir, MANIFEST_NAME)
+    if os.path.dirname(manifest_path):
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    manifest, manifest_lines = load_manifest(manifest_path)
+    if manifest_lines > len(manifest):
+        # Compacte les entrées remplacées par une relance
+        save_manifest(manifest, manifest_path)
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    parameters = split_parameters(max_size_mb, search, optimize, image_dpi, jpeg_quality,
+                                  parts_count, by)
+    
+    pending = []
+    skipped = 0
+    for input_path in find_pdf_files(input_dir):
+        relative_path = os.path.relpath(input_path, input_dir)
+        if is_done(manifest.get(relative_path), input_path, parameters, manifest_dir):
+            skipped += 1
+            continue
+        pending.append((os.path.getsize(input_path), relative_path))
+    # Les plus gros fichiers d'abord pour équilibrer la charge des processus
+    pending.sort(reverse=True)
+    
+    log(f"Dossier : {input_dir}")
+    log(f"{len(pending)} fichiers à découper, {skipped} déjà traités")
+    log("-" * 50)
+    
+    failed = []
+    with ProcessPoolExecutor(max_workers=max(1, jobs)) as executor, \
+            open(manifest_path, 'a', encoding='utf-8') as manifest_file:
+        futures = {}
+        for _, relative_path in pending:
+            input_path = os.path.join(input_dir, relative_path)
+            file_output_dir = None
+            if output_dir is not None:
+                file_output_dir = os.path.join(output_dir, os.path.dirname(relative_path))
+            future = executor.submit(_split_file_worker, input_path, max_size_mb,
+                                     file_output_dir, search, low_memory, max_rss_mb,
+                                     optimize, image_dpi, jpeg_quality, use_cache,
+                                     parts_count, by)
+            futures[future] = relative_path
         
-        pages_range = f"{current_pages[0]}-{current_pages[-1]}"
-        print(f"Créé : {output_filename}")
-        print(f"   Pages : {pages_range} | Taille : {final_size:.2f} MB")
+        for done, future in enumerate(as_completed(futures), 1):
+            relative_path = futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                failed.append(relative_path)
+                log(f"[{done}/{len(pending)}] Erreur : {relative_path} : {e}")
+                continue
+            entry = dict(file=relative_path, parameters=parameters, **entry)
+            for part in entry["parts"]:
+                part["file"] = os.path.relpath(os.path.abspath(part["file"]), manifest_dir)
+            # Parties d'un découpage précédent qui n'ont pas été réécrites
+            previous = manifest.get(relative_path)
+            if previous is not None:
+                current = {part["file"] for part in entry["parts"]}
+                for part in previous["parts"]:
+                    stale_path = os.path.join(manifest_dir, part["file"])
+                    if part["file"] not in current and os.path.exists(stale_path):
+                        os.remove(stale_path)
+            manifest[relative_path] = entry
+            append_manifest(entry, manifest_file)
+            log(f"[{done}/{len(pending)}] {relative_path} : {len(entry['parts'])} parties")
     
-    print("-" * 50)
-    print(f"Terminé ! {len(created_files)} fichiers créés")
+    log("-" * 50)
+    log(f"Terminé ! {len(pending) - len(failed)} fichiers découpés, {len(failed)} en erreur")
+    log(f"Manifeste : {manifest_path}")
+    peak = peak_rss_mb(children=True)
+    if peak:
+        log(f"Mémoire maximale (RSS) par processus : {peak:.0f} MB")
     
-    return created_files
+    return failed
 
 def main():
     """Fonction principale - choisit entre GUI et ligne de commande"""
     
+    record_timing("script")
+    
     # Si aucun argument, lancer l'interface graphique
     if len(sys.argv) == 1:
         root = tk.Tk()
@@ -451,6 +1973,18 @@ Exemples d'utilisation:
   %(prog)s mon_fichier.pdf          # Mode ligne de commande
   %(prog)s mon_fichier.pdf -s 10
   %(prog)s mon_fichier.pdf -s 25 -o ./dossier_sortie/
+  %(prog)s mon_fichier.pdf --search galloping
+  %(prog)s mon_fichier.pdf -s 10 --jobs 8
+  %(prog)s --batch ./archives/ -s 10 --jobs 8 -o ./parties/
+  %(prog)s tres_gros.pdf --low-memory --max-rss 2048
+  %(prog)s mon_fichier.pdf -s 10 --optimize
+  %(prog)s scan.pdf -s 10 --images-dpi 150 --jpeg-quality 70
+  %(prog)s mon_fichier.pdf --parts 8
+  %(prog)s recueil.pdf --by outline -s 10
+  %(prog)s mon_fichier.pdf -s 10 --plan --json
+  %(prog)s mon_fichier.pdf -s 10 --profile --metrics-format prometheus
+  cat mon_fichier.pdf | %(prog)s - -s 10 --archive tar > parties.tar
+  %(prog)s mon_fichier.pdf --plan --timings
             """
         )
         
@@ -465,27 +1999,206 @@ Exemples d'utilisation:
         parser.add_argument('-o', '--output', 
                            help='Répertoire de sortie (défaut: même que le fichier d\'entrée)')
         
+        parser.add_argument('--search',
+                           choices=['plan', 'galloping'],
+                           default='plan',
+                           help='Recherche des bornes : planification en une passe (défaut) '
+                                'ou essais en mémoire par galop et dichotomie')
+        
+        parser.add_argument('-j', '--jobs',
+                           type=int,
+                           default=1,
+                           help='Nombre de processus pour écrire les parties, ou pour '
+                                'traiter les fichiers en mode lot (défaut: 1)')
+        
+        parser.add_argument('--batch', metavar='DIR',
+                           help='Découper tous les PDF d\'une arborescence')
+        
+        parser.add_argument('--manifest',
+                           help='Manifeste du mode lot (défaut: pdf_splitter_manifest.jsonl '
+                                'dans le dossier de sortie)')
+        
+        parser.add_argument('--low-memory', action='store_true',
+                           help='Mode mémoire réduite : lecture à la demande et libération '
+                                'des objets après chaque partie')
+        
+        parser.add_argument('--max-rss', type=float, metavar='MB',
+                           help='Interrompre le découpage si la mémoire utilisée dépasse '
+                                'cette valeur en MB')
+        
+        parser.add_argument('--optimize', action='store_true',
+                           help='Compresser les flux et fusionner les objets identiques '
+                                'pour réduire la taille (et le nombre) des parties')
+        
+        parser.add_argument('--images-dpi', type=int, metavar='DPI',
+                           help='Réduire à cette résolution et recompresser en JPEG les images '
+                                'des pages qui dépassent seules la taille maximale '
+                                '(nécessite Pillow)')
+        
+        parser.add_argument('--jpeg-quality', type=int, default=75,
+                           help='Qualité JPEG des images recompressées (défaut: 75)')
+        
+        parser.add_argument('-n', '--parts', type=int, metavar='N',
+                           help='Découper en N parties de tailles aussi proches que possible '
+                                '(remplace --size)')
+        
+        parser.add_argument('--by', choices=['size', 'outline'], default='size',
+                           help='outline : couper aux signets de premier niveau et ne '
+                                'redécouper par taille que les chapitres trop gros (défaut: size)')
+        
+        parser.add_argument('--plan', action='store_true',
+                           help='Afficher le découpage prévu sans écrire de fichier')
+        
+        parser.add_argument('--json', action='store_true',
+                           help='Avec --plan, afficher le plan au format JSON')
+        
+        parser.add_argument('--no-cache', action='store_true',
+                           help='Ne pas utiliser le cache des profils de pages')
+        
+        parser.add_argument('--profile', action='store_true',
+                           help='Chronométrer chaque phase et enregistrer les mesures '
+                                '(sérialisations, octets écrits...)')
+        
+        parser.add_argument('--metrics-file',
+                           help='Fichier des mesures de --profile (défaut: '
+                                '<nom>_metrics.json ou .prom dans le dossier de sortie)')
+        
+        parser.add_argument('--metrics-format', choices=['json', 'prometheus'], default='json',
+                           help='Format du fichier des mesures (défaut: json)')
+        
+        parser.add_argument('--archive', choices=['tar', 'zip'],
+                           help='Écrire les parties dans une archive sur la sortie standard '
+                                'sans fichier sur le disque (input_pdf "-" lit l\'entrée standard)')
+        
+        parser.add_argument('--name',
+                           help='Préfixe des parties dans l\'archive (défaut: nom du fichier '
+                                'ou "document")')
+        
+        parser.add_argument('--timings', action='store_true',
+                           help='Afficher les durées de démarrage (chargement du script, '
+                                'import de PyPDF2) sur la sortie d\'erreur')
+        
         args = parser.parse_args()
         
-        if not args.input_pdf:
+        if args.by == "outline" and args.parts is not None:
+            parser.error("--by outline et --parts sont incompatibles")
+        if args.parts is not None and args.parts < 1:
+            parser.error("--parts doit être un entier positif")
+        if args.batch and (args.profile or args.metrics_file):
+            parser.error("--profile et --metrics-file ne sont pas disponibles avec --batch "
+                         "(mesures propres à chaque processus)")
+        
+        if not args.input_pdf and not args.batch:
             # Pas de fichier spécifié, lancer l'interface graphique
             root = tk.Tk()
             app = PDFSplitterGUI(root)
             root.mainloop()
         else:
             # Mode ligne de commande
+            metrics_path = args.metrics_file
+            if args.profile and metrics_path is None and not args.batch:
+                if args.input_pdf == "-":
+                    base_name, default_dir = args.name or "document", ""
+                else:
+                    base_name = os.path.splitext(os.path.basename(args.input_pdf))[0]
+                    default_dir = os.path.dirname(args.input_pdf)
+                extension = ".prom" if args.metrics_format == "prometheus" else ".json"
+                metrics_path = os.path.join(args.output or default_dir,
+                                            f"{base_name}_metrics{extension}")
             try:
-                split_pdf_by_size(
-                    input_pdf_path=args.input_pdf,
-                    max_size_mb=args.size,
-                    output_dir=args.output
-                )
-            except FileNotFoundError as e:
+                if args.batch:
+                    failed = split_directory(
+                        input_dir=args.batch,
+                        max_size_mb=args.size,
+                        output_dir=args.output,
+                        jobs=args.jobs,
+                        search=args.search,
+                        manifest_path=args.manifest,
+                        low_memory=args.low_memory,
+                        max_rss_mb=args.max_rss,
+                        optimize=args.optimize,
+                        image_dpi=args.images_dpi,
+                        jpeg_quality=args.jpeg_quality,
+                        use_cache=not args.no_cache,
+                        parts_count=args.parts,
+                        by=args.by
+                    )
+                    if failed:
+                        sys.exit(1)
+                elif args.archive or args.input_pdf == "-":
+                    if sys.stdout.isatty():
+                        print("Erreur : rediriger la sortie standard vers un fichier ou un programme",
+                              file=sys.stderr)
+                        sys.exit(1)
+                    if args.input_pdf == "-":
+                        source = sys.stdin.buffer
+                        base_name = args.name or "document"
+                    else:
+                        source = args.input_pdf
+                        base_name = args.name or os.path.splitext(os.path.basename(args.input_pdf))[0]
+                    log = lambda message: print(message, file=sys.stderr)
+                    if metrics_path is not None:
+                        metrics.start()
+                    run_start = time.perf_counter()
+                    parts = iter_split_parts(source, max_size_mb=args.size,
+                                             parts_count=args.parts, optimize=args.optimize,
+                                             low_memory=args.low_memory, by=args.by)
+                    count = write_parts_archive(
+                        parts, sys.stdout.buffer, args.archive or "tar", base_name, log=log)
+                    print(f"Terminé ! {count} parties écrites", file=sys.stderr)
+                    if metrics_path is not None:
+                        finish_metrics(metrics_path, args.metrics_format, base_name,
+                                       run_start, log)
+                elif args.plan:
+                    if metrics_path is not None:
+                        metrics.start()
+                    run_start = time.perf_counter()
+                    plan = plan_split(
+                        input_pdf_path=args.input_pdf,
+                        max_size_mb=args.size,
+                        parts_count=args.parts,
+                        by=args.by,
+                        optimize=args.optimize,
+                        use_cache=not args.no_cache,
+                        low_memory=args.low_memory,
+                        max_rss_mb=args.max_rss
+                    )
+                    if args.json:
+                        print(json.dumps(plan, ensure_ascii=False, indent=2))
+                    else:
+                        print_plan(plan)
+                    if metrics_path is not None:
+                        # Les mesures ne doivent pas se mêler à la sortie JSON
+                        finish_metrics(metrics_path, args.metrics_format,
+                                       os.path.basename(args.input_pdf), run_start,
+                                       log=lambda message: print(message, file=sys.stderr))
+                else:
+                    split_pdf_by_size(
+                        input_pdf_path=args.input_pdf,
+                        max_size_mb=args.size,
+                        output_dir=args.output,
+                        search=args.search,
+                        jobs=args.jobs,
+                        parts_count=args.parts,
+                        low_memory=args.low_memory,
+                        max_rss_mb=args.max_rss,
+                        optimize=args.optimize,
+                        image_dpi=args.images_dpi,
+                        jpeg_quality=args.jpeg_quality,
+                        use_cache=not args.no_cache,
+                        metrics_path=metrics_path,
+                        metrics_format=args.metrics_format,
+                        by=args.by
+                    )
+            except (FileNotFoundError, ImportError, MemoryError) as e:
                 print(f"Erreur : {e}", file=sys.stderr)
                 sys.exit(1)
             except Exception as e:
                 print(f"Erreur inattendue : {e}", file=sys.stderr)
                 sys.exit(1)
+            finally:
+                if args.timings:
+                    print(f"Démarrage : {format_timings()}", file=sys.stderr)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,103 @@
+"""
+Tests du découpage de PDF : python -m pytest GestionPDF
+Les fichiers de test sont générés dans un dossier temporaire.
+"""
+
+import os
+import tempfile
+import unittest
+import zlib
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject,
+                            EncodedStreamObject, NameObject, NumberObject)
+
+import pdf_splitter
+
+
+def noise_image(writer, size=400):
+    """Ajoute une image RVB aléatoire compressée en Flate (peu compressible)"""
+    image = EncodedStreamObject()
+    image.update({
+        NameObject("/Type"): NameObject("/XObject"),
+        NameObject("/Subtype"): NameObject("/Image"),
+        NameObject("/Width"): NumberObject(size),
+        NameObject("/Height"): NumberObject(size),
+        NameObject("/ColorSpace"): NameObject("/DeviceRGB"),
+        NameObject("/BitsPerComponent"): NumberObject(8),
+        NameObject("/Filter"): NameObject("/FlateDecode"),
+    })
+    image._data = zlib.compress(os.urandom(size * size * 3))
+    return writer._add_object(image)
+
+
+def indirect_resources(writer, xobjects):
+    """Dictionnaire de ressources indirect dont le /XObject est lui aussi indirect"""
+    xobject_dict = writer._add_object(DictionaryObject(
+        {NameObject(name): ref for name, ref in xobjects.items()}))
+    return writer._add_object(DictionaryObject({NameObject("/XObject"): xobject_dict}))
+
+
+def write_indirect_resources_pdf(path, pages=2, shared=False):
+    """
+    Écrit un PDF dont chaque page d'un pouce affiche une image directement et
+    une autre par un formulaire, toutes les ressources étant des références.
+    Avec shared, la première image est commune à toutes les pages.
+    """
+    writer = PdfWriter()
+    shared_image = noise_image(writer) if shared else None
+    for _ in range(pages):
+        writer.add_blank_page(72, 72)
+        page = writer.pages[-1]
+        form = DecodedStreamObject()
+        form.update({
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Form"),
+            NameObject("/BBox"): ArrayObject([NumberObject(0), NumberObject(0),
+                                              NumberObject(72), NumberObject(72)]),
+            NameObject("/Resources"): indirect_resources(writer, {"/Im1": noise_image(writer)}),
+        })
+        form.set_data(b"q 72 0 0 72 0 0 cm /Im1 Do Q")
+        content = DecodedStreamObject()
+        content.set_data(b"q 72 0 0 72 0 0 cm /Im0 Do Q /Fm0 Do")
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = indirect_resources(writer, {
+            "/Im0": shared_image or noise_image(writer),
+            "/Fm0": writer._add_object(form),
+        })
+    with open(path, 'wb') as f:
+        writer.write(f)
+
+
+class IndirectResourcesTest(unittest.TestCase):
+    """Images atteintes par des /Resources et /XObject indirects"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.temp_dir.name, "scan_indirect.pdf")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_shared_image_ids(self):
+        write_indirect_resources_pdf(self.pdf_path, shared=True)
+        reader = PdfReader(self.pdf_path)
+        shared = pdf_splitter.shared_image_ids(reader)
+        first_page = reader.pages[0]["/Resources"].get_object()["/XObject"].get_object()
+        self.assertEqual(shared, {first_page.raw_get("/Im0").idnum})
+
+    def test_recompress_oversized_pages(self):
+        if not pdf_splitter.load_pillow():
+            self.skipTest("Pillow n'est pas installé")
+        write_indirect_resources_pdf(self.pdf_path)
+        output_dir = os.path.join(self.temp_dir.name, "parties")
+        created_files = pdf_splitter.split_pdf_by_size(
+            self.pdf_path, 0.5, output_dir, log=lambda message: None,
+            image_dpi=100, use_cache=False)
+        self.assertEqual(len(created_files), 2)
+        for path in created_files:
+            self.assertLess(os.path.getsize(path), 0.5 * 1024 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()